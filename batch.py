@@ -0,0 +1,206 @@
+'''CSV manifest batches: one styled, optionally verified code per row'''
+import os
+import csv
+import zlib
+from dataclasses import dataclass, replace
+from PIL import Image, ImageColor
+
+from decoder import verify_image
+from encoder import SymbolGrid, encode_symbols, pack_matrix, unpack_matrix
+from payloads import format_payload, payload_fields
+from pipeline import iter_batch, pipeline_stage
+from renderer import EXPORT_BOX_SIZE, MODULE_SHAPES, QRStyle, export_formats, parse_formats, save_matrix
+
+
+def should_verify(number, rate):
+    '''Deterministic sampling: the same rows are picked for the same rate'''
+    if rate >= 1:
+        return True
+    return rate > 0 and zlib.crc32(str(number).encode('ascii')) / 0xffffffff < rate
+
+
+def style_from_row(row, base=QRStyle()):
+    '''Read the optional style columns of a manifest row on top of a base style'''
+    overrides = {}
+
+    for column in ('fill_color', 'back_color', 'gradient_color'):
+        value = (row.get(column) or '').strip()
+        if value:
+            try:
+                ImageColor.getrgb(value)
+            except ValueError:
+                raise ValueError(f'Invalid color for {column}: {value}')
+            overrides[column] = value
+
+    shape = (row.get('module_shape') or '').strip().lower()
+    if shape:
+        if shape not in MODULE_SHAPES:
+            raise ValueError(f'Unknown module shape: {shape}')
+        overrides['module_shape'] = shape
+
+    logo = (row.get('logo') or '').strip()
+    if logo:
+        if not os.path.isfile(logo):
+            raise ValueError(f'Logo file not found: {logo}')
+        overrides['logo_path'] = logo
+
+    return replace(base, **overrides)
+
+
+def payload_from_row(row):
+    '''Build (mode, encoded fields, payload) for a manifest row (mode column defaults to url)'''
+    mode = (row.get('mode') or 'url').strip().lower()
+    values = payload_fields(mode, {key: value or '' for key, value in row.items() if key})
+    return mode, values, format_payload(mode, values)
+
+
+def max_version_from_row(row):
+    '''Largest symbol version for a manifest row; bigger payloads are split'''
+    value = (row.get('max_version') or '').strip()
+    if not value:
+        return 40
+
+    if not value.isdigit() or not 1 <= int(value) <= 40:
+        raise ValueError(f'Invalid max_version: {value} (expected 1-40)')
+
+    return int(value)
+
+
+def read_manifest(manifest_path):
+    '''Read a CSV manifest (comma, semicolon or tab separated) into row dicts'''
+    with open(manifest_path, newline='', encoding='utf-8-sig') as manifest:
+        sample = manifest.read(4096)
+        manifest.seek(0)
+
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+
+        return list(csv.DictReader(manifest, dialect=dialect))
+
+
+@dataclass
+class BatchResult:
+    '''Outcome of one manifest row'''
+    number: int
+    filename: str
+    matrix: tuple | None = None
+    style: QRStyle | None = None
+    payload: str | None = None
+    verified: bool = False
+    error: str | None = None
+    formats: tuple | None = None
+    mode: str = 'url'
+    fields: dict | None = None
+    grid: SymbolGrid | None = None
+
+
+@dataclass(frozen=True)
+class ExportOptions:
+    '''Where and how batch results are saved'''
+    output_dir: str
+    box_size: int = EXPORT_BOX_SIZE
+    verify_rate: float = 0
+    low_memory: bool = False
+    formats: tuple | None = None
+    # Threads per multi-format export; 1 keeps the work visible to profilers
+    export_workers: int | None = None
+
+
+def process_row(number, row, options=None):
+    '''Encode one manifest row, saving (and optionally verifying) it when options are given'''
+    filename = (row.get('filename') or '').strip() or f'qrcode_{number:05d}.png'
+
+    try:
+        with pipeline_stage('payload'):
+            mode, fields, data = payload_from_row(row)
+            style = style_from_row(row)
+            formats = parse_formats(row['formats']) if (row.get('formats') or '').strip() else None
+            max_version = max_version_from_row(row)
+        # Rows already run in worker processes, so split parts are encoded inline
+        matrix, grid = encode_symbols(data, max_version, workers=1)
+    except Exception as e:
+        return BatchResult(number, filename, error=str(e))
+
+    result = BatchResult(
+        number, filename, pack_matrix(matrix), style, data,
+        formats=formats, mode=mode, fields=fields, grid=grid
+    )
+
+    if options is not None:
+        result = _save_result(result, matrix, options)
+
+    return result
+
+
+def export_result(result, options):
+    '''Render and save an already encoded batch result'''
+    if result.error is not None:
+        return result
+
+    return _save_result(result, unpack_matrix(result.matrix), options)
+
+
+def _save_result(result, matrix, options):
+    '''Render, save and (for sampled rows) decode back every saved raster file'''
+    path = os.path.join(options.output_dir, result.filename)
+    formats = result.formats or options.formats
+
+    try:
+        if formats:
+            with pipeline_stage('export'):
+                paths, _ = export_formats(
+                    matrix, os.path.splitext(path)[0], formats, result.style,
+                    options.box_size, options.low_memory, result.grid, options.export_workers
+                )
+        else:
+            save_matrix(matrix, path, options.box_size, result.style, options.low_memory, result.grid)
+            paths = [path]
+    except Exception as e:
+        return replace(result, error=str(e))
+
+    if should_verify(result.number, options.verify_rate):
+        with pipeline_stage('verify'):
+            error = verify_files(paths, result.grid, result.payload, result.mode, result.fields)
+        return replace(result, verified=error is None, error=error)
+
+    return result
+
+
+def verify_files(paths, grid, data, mode='url', fields=None):
+    '''Decode saved raster files back; returns the first error message or None'''
+    for path in paths:
+        if os.path.splitext(path)[1].lower() == '.svg':
+            continue
+
+        with Image.open(path) as saved:
+            if saved.width < grid.columns * grid.size:
+                # Thumbnails of big sheets are scaled below a pixel per module
+                continue
+
+            error = verify_image(saved, data, grid, mode, fields)
+
+        if error is not None:
+            return f'{os.path.basename(path)}: {error}'
+
+    return None
+
+
+def run_manifest(manifest_path, options, workers=None):
+    '''Generate one image per manifest row; returns (saved, verified, failures)'''
+    os.makedirs(options.output_dir, exist_ok=True)
+    tasks = list(enumerate(read_manifest(manifest_path), start=1))
+    saved = 0
+    verified = 0
+    failures = []
+
+    for chunk in iter_batch(process_row, tasks, (options,), workers):
+        for result in chunk:
+            if result.error is None:
+                saved += 1
+                verified += result.verified
+            else:
+                failures.append((result.number, result.error))
+
+    return saved, verified, sorted(failures)
@@ -0,0 +1,423 @@
+'''Reads rendered QR codes back, to verify exports without a phone'''
+import qrcode.base
+import qrcode.util
+
+from payloads import parse_payload
+
+
+class QRDecodeError(ValueError):
+    '''Raised when a rendered QR code cannot be read back'''
+
+
+# GF(256) tables for Reed-Solomon decoding (QR primitive polynomial 0x11d)
+_GF_EXP = [0] * 512
+_GF_LOG = [0] * 256
+_value = 1
+for _power in range(255):
+    _GF_EXP[_power] = _value
+    _GF_LOG[_value] = _power
+    _value <<= 1
+    if _value & 0x100:
+        _value ^= 0x11d
+for _power in range(255, 512):
+    _GF_EXP[_power] = _GF_EXP[_power - 255]
+del _value, _power
+
+# Every valid 15-bit format word, keyed to (error correction, mask pattern)
+_FORMAT_WORDS = {
+    qrcode.util.BCH_type_info((ec << 3) | mask): (ec, mask)
+    for ec in range(4) for mask in range(8)
+}
+
+
+def _gf_mul(a, b):
+    if a == 0 or b == 0:
+        return 0
+    return _GF_EXP[_GF_LOG[a] + _GF_LOG[b]]
+
+
+def _gf_div(a, b):
+    if a == 0:
+        return 0
+    return _GF_EXP[(_GF_LOG[a] + 255 - _GF_LOG[b]) % 255]
+
+
+def _gf_pow(a, power):
+    return _GF_EXP[(_GF_LOG[a] * power) % 255]
+
+
+def _poly_scale(poly, factor):
+    return [_gf_mul(coef, factor) for coef in poly]
+
+
+def _poly_add(p, q):
+    result = [0] * max(len(p), len(q))
+    for i, coef in enumerate(p):
+        result[i + len(result) - len(p)] = coef
+    for i, coef in enumerate(q):
+        result[i + len(result) - len(q)] ^= coef
+    return result
+
+
+def _poly_mul(p, q):
+    result = [0] * (len(p) + len(q) - 1)
+    for j, b in enumerate(q):
+        for i, a in enumerate(p):
+            result[i + j] ^= _gf_mul(a, b)
+    return result
+
+
+def _poly_eval(poly, x):
+    y = poly[0]
+    for coef in poly[1:]:
+        y = _gf_mul(y, x) ^ coef
+    return y
+
+
+def _rs_correct(block, ec_count):
+    '''Correct a data + EC block in place (highest degree first); returns the data'''
+    syndromes = [_poly_eval(block, _gf_pow(2, i)) for i in range(ec_count)]
+
+    if not any(syndromes):
+        return block[:-ec_count]
+
+    # Berlekamp-Massey for the error locator polynomial
+    locator = [1]
+    previous = [1]
+    for i in range(ec_count):
+        delta = syndromes[i]
+        for j in range(1, len(locator)):
+            delta ^= _gf_mul(locator[-(j + 1)], syndromes[i - j])
+        previous = previous + [0]
+        if delta:
+            if len(previous) > len(locator):
+                scaled = _poly_scale(previous, delta)
+                previous = _poly_scale(locator, _gf_div(1, delta))
+                locator = scaled
+            locator = _poly_add(locator, _poly_scale(previous, delta))
+
+    while locator and locator[0] == 0:
+        del locator[0]
+
+    error_count = len(locator) - 1
+    if error_count * 2 > ec_count:
+        raise QRDecodeError('Too many errors to correct')
+
+    # Chien search for the error positions
+    length = len(block)
+    positions = [
+        length - 1 - i for i in range(length)
+        if _poly_eval(locator[::-1], _gf_pow(2, i)) == 0
+    ]
+    if len(positions) != error_count:
+        raise QRDecodeError('Could not locate errors')
+
+    # Forney algorithm for the error magnitudes
+    coef_positions = [length - 1 - p for p in positions]
+    errata = [1]
+    for p in coef_positions:
+        errata = _poly_mul(errata, [_gf_pow(2, p), 1])
+
+    padded = syndromes[::-1] + [0]
+    product = _poly_mul(padded, errata)
+    evaluator = product[len(product) - len(errata):]
+
+    roots = [_gf_pow(2, p) for p in coef_positions]
+    for i, root in enumerate(roots):
+        root_inv = _gf_div(1, root)
+        derivative = 1
+        for j, other in enumerate(roots):
+            if j != i:
+                derivative = _gf_mul(derivative, 1 ^ _gf_mul(root_inv, other))
+        if derivative == 0:
+            raise QRDecodeError('Could not find error magnitude')
+        y = _gf_mul(root, _poly_eval(evaluator, root_inv))
+        block[positions[i]] ^= _gf_div(y, derivative)
+
+    if any(_poly_eval(block, _gf_pow(2, i)) for i in range(ec_count)):
+        raise QRDecodeError('Error correction failed')
+
+    return block[:-ec_count]
+
+
+def _sample_modules(image):
+    '''Locate the symbol in a rendered image and sample every module center
+
+    Rendered codes are axis aligned, so the symbol is the bounding box of the
+    dark pixels. Each candidate version is tried and the one whose finder and
+    timing patterns match best wins.
+    '''
+    gray = image.convert('L')
+    low, high = gray.getextrema()
+    if high - low < 32:
+        raise QRDecodeError('No contrast in image')
+
+    threshold = (low + high) // 2
+    box = gray.point(lambda v: 255 if v < threshold else 0).getbbox()
+    if box is None:
+        raise QRDecodeError('No QR code found')
+
+    left, top, right, bottom = box
+    pixels = gray.load()
+
+    def sampler(count):
+        step_x = (right - left) / count
+        step_y = (bottom - top) / count
+        return lambda r, c: pixels[
+            int(left + (c + 0.5) * step_x), int(top + (r + 0.5) * step_y)
+        ] < threshold
+
+    best = None
+    for version in range(1, 41):
+        count = version * 4 + 17
+        if (right - left) < count or (bottom - top) < count:
+            break
+
+        dark = sampler(count)
+        checks = 0
+        matches = 0
+        for row, col in ((0, 0), (0, count - 7), (count - 7, 0)):
+            for r in range(7):
+                for c in range(7):
+                    expected = r in (0, 6) or c in (0, 6) or (2 <= r <= 4 and 2 <= c <= 4)
+                    matches += dark(row + r, col + c) == expected
+                    checks += 1
+        for i in range(8, count - 8):
+            matches += dark(6, i) == (i % 2 == 0)
+            matches += dark(i, 6) == (i % 2 == 0)
+            checks += 2
+
+        score = matches / checks
+        if best is None or score > best[0]:
+            best = (score, count, dark)
+
+    if best is None or best[0] < 0.9:
+        raise QRDecodeError('No QR code found')
+
+    _, count, dark = best
+    return [[dark(r, c) for c in range(count)] for r in range(count)]
+
+
+def _function_modules(version):
+    '''Matrix of modules that carry patterns or format/version info, not data'''
+    count = version * 4 + 17
+    reserved = [[False] * count for _ in range(count)]
+
+    def mark(row, col, height, width):
+        for r in range(max(row, 0), min(row + height, count)):
+            for c in range(max(col, 0), min(col + width, count)):
+                reserved[r][c] = True
+
+    # Finder patterns, separators and format information
+    mark(0, 0, 9, 9)
+    mark(0, count - 8, 9, 8)
+    mark(count - 8, 0, 8, 9)
+
+    # Timing patterns
+    mark(6, 0, 1, count)
+    mark(0, 6, count, 1)
+
+    positions = qrcode.util.pattern_position(version)
+    for row in positions:
+        for col in positions:
+            # Alignment patterns never overlap the finder corners
+            if (row < 9 and col < 9) or (row < 9 and col > count - 9) or (row > count - 9 and col < 9):
+                continue
+            mark(row - 2, col - 2, 5, 5)
+
+    if version >= 7:
+        mark(0, count - 11, 6, 3)
+        mark(count - 11, 0, 3, 6)
+
+    return reserved
+
+
+def _read_format(modules):
+    '''Read (error correction, mask pattern) from either copy of the format bits'''
+    count = len(modules)
+    first = 0
+    second = 0
+
+    for i in range(15):
+        if i < 6:
+            first |= modules[i][8] << i
+        elif i < 8:
+            first |= modules[i + 1][8] << i
+        else:
+            first |= modules[count - 15 + i][8] << i
+
+        if i < 8:
+            second |= modules[8][count - i - 1] << i
+        elif i < 9:
+            second |= modules[8][15 - i] << i
+        else:
+            second |= modules[8][14 - i] << i
+
+    # Format words are at least 7 bits apart, so up to 3 bit errors are fine
+    for word in (first, second):
+        for valid, info in _FORMAT_WORDS.items():
+            if bin(word ^ valid).count('1') <= 3:
+                return info
+
+    raise QRDecodeError('Unreadable format information')
+
+
+def _read_codewords(modules, version, mask_pattern):
+    '''Read the masked data modules back in the zigzag placement order'''
+    count = len(modules)
+    reserved = _function_modules(version)
+    mask = qrcode.util.mask_func(mask_pattern)
+    bits = []
+
+    row = count - 1
+    step = -1
+    for col in range(count - 1, 0, -2):
+        if col <= 6:
+            col -= 1
+
+        while 0 <= row < count:
+            for c in (col, col - 1):
+                if not reserved[row][c]:
+                    bits.append(modules[row][c] ^ mask(row, c))
+            row += step
+
+        row -= step
+        step = -step
+
+    codewords = []
+    for i in range(0, len(bits) - 7, 8):
+        value = 0
+        for bit in bits[i:i + 8]:
+            value = (value << 1) | bit
+        codewords.append(value)
+
+    return codewords
+
+
+def _parse_segments(data, version):
+    '''Decode the segment bit stream (numeric, alphanumeric and byte modes)'''
+    bits = ''.join(f'{byte:08b}' for byte in data)
+    position = 0
+    output = bytearray()
+
+    def take(length):
+        nonlocal position
+        if position + length > len(bits):
+            raise QRDecodeError('Truncated data')
+        value = int(bits[position:position + length], 2)
+        position += length
+        return value
+
+    while position + 4 <= len(bits):
+        mode = take(4)
+
+        if mode == 0:
+            break
+
+        if mode == 0b0011:
+            # Structured Append header: index, total and parity
+            take(16)
+            continue
+
+        if mode == 0b0111:
+            # ECI designator; payloads here are always UTF-8
+            take(8)
+            continue
+
+        if mode not in (qrcode.util.MODE_NUMBER, qrcode.util.MODE_ALPHA_NUM, qrcode.util.MODE_8BIT_BYTE):
+            raise QRDecodeError(f'Unsupported segment mode {mode}')
+
+        length = take(qrcode.util.length_in_bits(mode, version))
+
+        if mode == qrcode.util.MODE_NUMBER:
+            while length >= 3:
+                output += f'{take(10):03d}'.encode('ascii')
+                length -= 3
+            if length == 2:
+                output += f'{take(7):02d}'.encode('ascii')
+            elif length == 1:
+                output += f'{take(4):01d}'.encode('ascii')
+
+        elif mode == qrcode.util.MODE_ALPHA_NUM:
+            alphabet = qrcode.util.ALPHA_NUM
+            while length >= 2:
+                pair = take(11)
+                output += alphabet[pair // 45:pair // 45 + 1] + alphabet[pair % 45:pair % 45 + 1]
+                length -= 2
+            if length:
+                value = take(6)
+                output += alphabet[value:value + 1]
+
+        else:
+            output += bytes(take(8) for _ in range(length))
+
+    try:
+        return output.decode('utf-8')
+    except UnicodeDecodeError:
+        return output.decode('latin-1')
+
+
+def decode_image(image):
+    '''Decode a rendered QR code image back into its text'''
+    modules = _sample_modules(image)
+    version = (len(modules) - 17) // 4
+    error_correction, mask_pattern = _read_format(modules)
+    codewords = _read_codewords(modules, version, mask_pattern)
+
+    blocks = qrcode.base.rs_blocks(version, error_correction)
+    max_data = max(block.data_count for block in blocks)
+    max_ec = max(block.total_count - block.data_count for block in blocks)
+
+    # Undo the codeword interleaving
+    data_parts = [[] for _ in blocks]
+    ec_parts = [[] for _ in blocks]
+    index = 0
+    for i in range(max_data):
+        for b, block in enumerate(blocks):
+            if i < block.data_count:
+                data_parts[b].append(codewords[index])
+                index += 1
+    for i in range(max_ec):
+        for b, block in enumerate(blocks):
+            if i < block.total_count - block.data_count:
+                ec_parts[b].append(codewords[index])
+                index += 1
+
+    data = []
+    for b, block in enumerate(blocks):
+        data += _rs_correct(data_parts[b] + ec_parts[b], block.total_count - block.data_count)
+
+    return _parse_segments(data, version)
+
+
+def decode_sheet(image, grid):
+    '''Decode a sheet of Structured Append symbols laid out in order and join their text'''
+    width = image.width // grid.columns
+    height = image.height // grid.rows
+    texts = []
+
+    for index in range(grid.count):
+        r, c = divmod(index, grid.columns)
+        texts.append(decode_image(image.crop((c * width, r * height, (c + 1) * width, (r + 1) * height))))
+
+    return ''.join(texts)
+
+
+def verify_image(image, data, grid=None, mode='url', fields=None):
+    '''Decode a rendered image and return an error message if it does not match
+
+    With the source fields given, the decoded text is also parsed back the way
+    a phone reads it, which catches payloads that were built wrongly.
+    '''
+    try:
+        decoded = decode_image(image) if grid is None or grid.count == 1 else decode_sheet(image, grid)
+    except QRDecodeError as e:
+        return f'Verification failed: {e}'
+
+    if decoded != data:
+        return 'Verification failed: decoded text does not match the payload'
+
+    if fields is not None and parse_payload(mode, decoded) != fields:
+        return 'Verification failed: decoded fields do not match the source row'
+
+    return None
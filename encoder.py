@@ -0,0 +1,227 @@
+'''QR encoding, including Structured Append sheets of linked symbols'''
+import math
+from dataclasses import dataclass
+import qrcode
+import qrcode.base
+import qrcode.exceptions
+import qrcode.util
+
+from pipeline import iter_batch, pipeline_stage
+
+
+# QR code settings shared by the GUI and the batch runner
+ERROR_CORRECTION = qrcode.constants.ERROR_CORRECT_H
+QR_BORDER = 4
+
+# Structured Append links up to 16 symbols into one message
+MAX_SYMBOLS = 16
+# Below this many modules in total, starting worker processes costs more than it saves
+PARALLEL_ENCODE_MODULES = 100_000
+
+
+def encode_matrix(data):
+    '''Encode data into a QR module matrix (rows of bools, quiet zone included)'''
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=ERROR_CORRECTION,
+        border=QR_BORDER,
+    )
+
+    # Same steps as qr.make(fit=True), split so profiles can tell them apart
+    with pipeline_stage('encode'):
+        qr.add_data(data)
+        qr.best_fit(start=qr.version)
+        qr.data_cache = qrcode.util.create_data(qr.version, qr.error_correction, qr.data_list)
+
+    with pipeline_stage('mask'):
+        qr.makeImpl(False, qr.best_mask_pattern())
+        return qr.get_matrix()
+
+
+def _fits_version(data, max_version):
+    '''True when data fits a single symbol no larger than max_version'''
+    qr = qrcode.QRCode(error_correction=ERROR_CORRECTION)
+    qr.add_data(data)
+    try:
+        return qr.best_fit() <= max_version
+    except (qrcode.exceptions.DataOverflowError, ValueError):
+        # Some qrcode releases reject version 41 in the setter instead
+        return False
+
+
+def _part_capacity(version):
+    '''Payload bytes one Structured Append symbol of this version can hold'''
+    header_bits = 20 + 4 + qrcode.util.length_in_bits(qrcode.util.MODE_8BIT_BYTE, version)
+    return (qrcode.util.BIT_LIMIT_TABLE[ERROR_CORRECTION][version] - header_bits) // 8
+
+
+def split_payload(data, max_version=40):
+    '''Split text into at most MAX_SYMBOLS parts that fit max_version symbols
+
+    Parts break between characters (each symbol decodes to valid text) and
+    are balanced in size, so every symbol comes out about the same version.
+    '''
+    capacity = _part_capacity(max_version)
+    total = len(data.encode('utf-8'))
+
+    for count in range(max(math.ceil(total / capacity), 2), MAX_SYMBOLS + 1):
+        target = math.ceil(total / count)
+        parts = ['']
+        size = 0
+
+        for char in data:
+            length = len(char.encode('utf-8'))
+            if parts[-1] and (size >= target or size + length > capacity):
+                parts.append('')
+                size = 0
+            parts[-1] += char
+            size += length
+
+        if len(parts) <= MAX_SYMBOLS:
+            return parts
+
+    raise ValueError(
+        f'Data is too long: it does not fit in {MAX_SYMBOLS} QR codes of version {max_version}'
+    )
+
+
+def _structured_append_data(version, data_list, index, total, parity):
+    '''Like qrcode.util.create_data, with a Structured Append header in front'''
+    buffer = qrcode.util.BitBuffer()
+    buffer.put(0b0011, 4)
+    buffer.put(index, 4)
+    buffer.put(total - 1, 4)
+    buffer.put(parity, 8)
+
+    for data in data_list:
+        buffer.put(data.mode, 4)
+        buffer.put(len(data), qrcode.util.length_in_bits(data.mode, version))
+        data.write(buffer)
+
+    bit_limit = qrcode.util.BIT_LIMIT_TABLE[ERROR_CORRECTION][version]
+    if len(buffer) > bit_limit:
+        raise qrcode.exceptions.DataOverflowError()
+
+    # Terminator, byte alignment and the standard pad codewords
+    for _ in range(min(bit_limit - len(buffer), 4)):
+        buffer.put_bit(False)
+    if len(buffer) % 8:
+        buffer.put(0, 8 - len(buffer) % 8)
+    for i in range((bit_limit - len(buffer)) // 8):
+        buffer.put(qrcode.util.PAD0 if i % 2 == 0 else qrcode.util.PAD1, 8)
+
+    return qrcode.util.create_bytes(buffer, qrcode.base.rs_blocks(version, ERROR_CORRECTION))
+
+
+def encode_part(index, total, parity, text, version):
+    '''Encode one Structured Append symbol; returns (index, matrix)'''
+    qr = qrcode.QRCode(
+        version=version,
+        error_correction=ERROR_CORRECTION,
+        border=QR_BORDER,
+    )
+
+    with pipeline_stage('encode'):
+        qr.data_list = [qrcode.util.QRData(text.encode('utf-8'), qrcode.util.MODE_8BIT_BYTE)]
+        qr.data_cache = _structured_append_data(version, qr.data_list, index, total, parity)
+
+    with pipeline_stage('mask'):
+        qr.makeImpl(False, qr.best_mask_pattern())
+        return index, qr.get_matrix()
+
+
+@dataclass(frozen=True)
+class SymbolGrid:
+    '''Where the symbols of an encoded matrix are
+
+    size is the module count of one symbol, quiet zone included. Sheets of
+    Structured Append symbols fill the first count cells of a rows x columns
+    grid in order; a single symbol is a 1 x 1 grid.
+    '''
+    size: int
+    rows: int = 1
+    columns: int = 1
+    count: int = 1
+
+    def origins(self):
+        '''Top-left module of every symbol, skipping unused cells'''
+        return [
+            (index // self.columns * self.size, index % self.columns * self.size)
+            for index in range(self.count)
+        ]
+
+
+def single_symbol(matrix):
+    '''Grid of a matrix that holds one symbol'''
+    return SymbolGrid(len(matrix))
+
+
+def compose_sheet(matrices):
+    '''Lay equally sized symbols out in a near-square grid; returns (matrix, grid)'''
+    columns = math.ceil(math.sqrt(len(matrices)))
+    size = len(matrices[0])
+    blank = [[False] * size for _ in range(size)]
+    cells = list(matrices) + [blank] * (-len(matrices) % columns)
+
+    matrix = [
+        [cell for matrix in cells[i:i + columns] for cell in matrix[r]]
+        for i in range(0, len(cells), columns)
+        for r in range(size)
+    ]
+    return matrix, SymbolGrid(size, len(cells) // columns, columns, len(matrices))
+
+
+def encode_symbols(data, max_version=40, workers=None, executor=None):
+    '''Encode data as one symbol, or as a sheet of Structured Append symbols
+
+    A sheet is used when the data does not fit a single symbol of at most
+    max_version (40 means only when it does not fit at all). The parts are
+    encoded in worker processes when there is enough work to pay for them;
+    pass a long-lived process executor to reuse its workers instead of
+    starting new ones. Returns (matrix, SymbolGrid).
+    '''
+    with pipeline_stage('encode'):
+        fits = _fits_version(data, max_version)
+
+    if fits:
+        matrix = encode_matrix(data)
+        return matrix, single_symbol(matrix)
+
+    parts = split_payload(data, max_version)
+    payload = data.encode('utf-8')
+    parity = 0
+    for byte in payload:
+        parity ^= byte
+
+    # Same version for every part so the sheet is a regular grid
+    version = max(
+        next(v for v in range(1, max_version + 1) if _part_capacity(v) >= len(part.encode('utf-8')))
+        for part in parts
+    )
+    tasks = [(index, len(parts), parity, part, version) for index, part in enumerate(parts)]
+
+    if len(parts) * (4 * version + 17) ** 2 < PARALLEL_ENCODE_MODULES:
+        workers = 1
+        executor = None
+
+    if executor is not None:
+        symbols = dict(executor.map(encode_part, *zip(*tasks)))
+    else:
+        symbols = dict(
+            symbol for chunk in iter_batch(encode_part, tasks, workers=workers, chunk_size=1)
+            for symbol in chunk
+        )
+    return compose_sheet([symbols[index] for index in range(len(parts))])
+
+
+def pack_matrix(matrix):
+    '''Pack a module matrix into (rows, columns, bytes) at one bit per module'''
+    bits = ''.join('1' if cell else '0' for row in matrix for cell in row)
+    return len(matrix), len(matrix[0]), int(bits, 2).to_bytes((len(bits) + 7) // 8, 'big')
+
+
+def unpack_matrix(packed):
+    '''Inverse of pack_matrix'''
+    rows, columns, data = packed
+    bits = bin(int.from_bytes(data, 'big'))[2:].zfill(rows * columns)
+    return [[bit == '1' for bit in bits[r * columns:(r + 1) * columns]] for r in range(rows)]
@@ -1,17 +1,206 @@
 import sys
+import os
+import argparse
+import time
+import multiprocessing
+import threading
+import sqlite3
+from collections import OrderedDict
+from dataclasses import replace
+from concurrent.futures import ProcessPoolExecutor
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QFileDialog, QMessageBox, QFrame,
-    QStackedWidget, QComboBox, QCheckBox
+    QStackedWidget, QComboBox, QCheckBox, QColorDialog, QSizePolicy,
+    QProgressBar, QListView
+)
+from PyQt6.QtCore import (
+    Qt, QSize, QEvent, QThread, QAbstractListModel, QModelIndex, pyqtSignal
 )
-from PyQt6.QtCore import Qt, QSize
 from PyQt6.QtGui import QPixmap, QImage, QFont, QPalette, QColor
-import qrcode
-from io import BytesIO
+from PIL import Image
+
+from batch import ExportOptions, export_result, process_row, read_manifest, run_manifest
+from encoder import encode_symbols, unpack_matrix
+from payloads import WIFI_SECURITY_TYPES, build_payload
+from pipeline import iter_batch, pipeline_stage, run_profiled
+from renderer import (
+    EXPORT_BOX_SIZE, MODULE_SHAPES, QRStyle, export_formats, parse_formats, preview_box_size,
+    render_matrix, save_matrix, write_svg
+)
+from short_links import (
+    SHORT_LINK_DB, SHORT_LINK_PORT, ShortLinkRegistry, create_link_server, default_short_base,
+    is_loopback_base, link_server_address, short_url
+)
 
 
-class QRCodeGeneratorApp(QMainWindow):
+# Largest symbol versions offered by the preview's size menu
+SPLIT_VERSIONS = (40, 20, 10)
+
+# Save dialog entry that writes PNG, SVG and a thumbnail side by side
+BUNDLE_FILTER = 'PNG + SVG + Thumbnail (*.png)'
+
+
+def pil_to_qpixmap(image):
+    '''Convert a rendered PIL image to a QPixmap without an encode round trip'''
+    if image.mode == 'P':
+        image = image.convert('RGB')
+
+    if image.mode == 'RGB':
+        fmt = QImage.Format.Format_RGB888
+        bytes_per_line = image.width * 3
+    else:
+        image = image.convert('L')
+        fmt = QImage.Format.Format_Grayscale8
+        bytes_per_line = image.width
+
+    with pipeline_stage('convert'):
+        data = image.tobytes()
+        # The QImage only borrows data; the pixmap takes its own copy
+        return QPixmap.fromImage(QImage(data, image.width, image.height, bytes_per_line, fmt))
+
+
+class QRPreviewLabel(QLabel):
+    '''Preview label that reports size and device pixel ratio changes'''
+    resized = pyqtSignal()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.resized.emit()
+
+    def event(self, event):
+        # Fired when the window moves to a screen with a different scale
+        if event.type() == QEvent.Type.DevicePixelRatioChange:
+            self.resized.emit()
+        return super().event(event)
+
+
+class BatchWorker(QThread):
+    '''Runs a batch function through iter_batch off the GUI thread'''
+    results_ready = pyqtSignal(list)
+    failed = pyqtSignal(str)
+
+    def __init__(self, func, tasks, args=(), workers=None):
+        super().__init__()
+        self.func = func
+        self.tasks = tasks
+        self.args = args
+        self.workers = workers
+        self.cancel_event = multiprocessing.get_context('spawn').Event()
+
+    def cancel(self):
+        '''Stop every worker before its next row; pending chunks are dropped'''
+        self.cancel_event.set()
+
+    def run(self):
+        batches = iter_batch(self.func, self.tasks, self.args, self.workers, cancel_event=self.cancel_event)
+
+        try:
+            for chunk in batches:
+                if self.cancel_event.is_set():
+                    break
+                self.results_ready.emit(chunk)
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            batches.close()
+
+
+class BatchResultsModel(QAbstractListModel):
+    '''One page of batch results; thumbnails are rendered only when shown
+
+    The list view only asks for the rows it paints, and rendered thumbnails
+    live in a small LRU cache, so the number of pixmaps stays bounded no
+    matter how many rows the manifest has.
+    '''
+    PAGE_SIZE = 500
+    THUMBNAIL_SIZE = 96
+    THUMBNAIL_CACHE = 600
+
     def __init__(self):
+        super().__init__()
+        self.results = []
+        self.page = 0
+        self.thumbnails = OrderedDict()
+
+    def reset(self, total):
+        '''Start a new batch with total pending rows'''
+        self.beginResetModel()
+        self.results = [None] * total
+        self.page = 0
+        self.thumbnails.clear()
+        self.endResetModel()
+
+    def add_results(self, chunk):
+        '''Store finished rows and refresh the ones on the current page'''
+        first = self.page * self.PAGE_SIZE
+        visible = []
+
+        for result in chunk:
+            position = result.number - 1
+            self.results[position] = result
+            self.thumbnails.pop(result.number, None)
+            if first <= position < first + self.PAGE_SIZE:
+                visible.append(position - first)
+
+        if visible:
+            self.dataChanged.emit(self.index(min(visible)), self.index(max(visible)))
+
+    def page_count(self):
+        return max(1, -(-len(self.results) // self.PAGE_SIZE))
+
+    def set_page(self, page):
+        self.beginResetModel()
+        self.page = max(0, min(page, self.page_count() - 1))
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return max(0, min(self.PAGE_SIZE, len(self.results) - self.page * self.PAGE_SIZE))
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        result = self.results[self.page * self.PAGE_SIZE + index.row()]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            if result is None:
+                return 'Pending…'
+            return result.filename if result.error is None else f'Row {result.number} failed'
+
+        if role == Qt.ItemDataRole.ToolTipRole and result is not None:
+            return result.error or result.filename
+
+        if role == Qt.ItemDataRole.ForegroundRole and result is not None and result.error:
+            return QColor('#dc2626')
+
+        if role == Qt.ItemDataRole.DecorationRole and result is not None and result.error is None:
+            return self.thumbnail(result)
+
+        return None
+
+    def thumbnail(self, result):
+        '''Render (or reuse) the thumbnail pixmap for a finished row'''
+        pixmap = self.thumbnails.get(result.number)
+
+        if pixmap is None:
+            count = max(result.matrix[:2])
+            box_size = preview_box_size(count, self.THUMBNAIL_SIZE)
+            pixmap = pil_to_qpixmap(render_matrix(unpack_matrix(result.matrix), box_size, result.style, result.grid))
+            self.thumbnails[result.number] = pixmap
+
+            if len(self.thumbnails) > self.THUMBNAIL_CACHE:
+                self.thumbnails.popitem(last=False)
+        else:
+            self.thumbnails.move_to_end(result.number)
+
+        return pixmap
+
+
+class QRCodeGeneratorApp(QMainWindow):
+    def __init__(self, low_memory=False, links_db=SHORT_LINK_DB, short_base=None):
         super().__init__()
         self.setWindowTitle('QR Code Generator')
         self.resize(600, 800)  # Initial size
@@ -26,9 +215,29 @@ class QRCodeGeneratorApp(QMainWindow):
         self.card_bg = '#ffffff'
         self.wifi_color = '#f59e0b'
         self.vcard_color = '#06b6d4'
+        self.batch_color = '#ec4899'
 
         # Variables
-        self.qr_image = None
+        self.qr_matrix = None
+        self.qr_grid = None
+        self.qr_data = None
+        self.qr_link_note = ''
+        self.split_version = SPLIT_VERSIONS[0]
+        self.qr_style = QRStyle()
+        self.preview_cache = {}
+        self.low_memory = low_memory
+        self.links_db = links_db
+        self.short_base = short_base or default_short_base()
+        self.link_registry = None
+        self.link_server = None
+        self.last_short_link = None
+        # Encodes the parts of split payloads; workers start on first use and
+        # stay for the session instead of being spawned for every preview
+        self.encode_pool = None
+        if (os.cpu_count() or 1) > 1:
+            self.encode_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
+        self.batch_worker = None
+        self.batch_manifest = None
         self.current_mode = None
 
         # Setup UI
@@ -68,6 +277,7 @@ class QRCodeGeneratorApp(QMainWindow):
         self.wifi_mode_screen = self.create_wifi_mode_screen()
         self.vcard_mode_screen = self.create_vcard_mode_screen()
         self.preview_screen = self.create_preview_screen()
+        self.batch_mode_screen = self.create_batch_mode_screen()
 
         # Add screens to stacked widget
         self.stacked_widget.addWidget(self.mode_selection_screen)
@@ -75,6 +285,7 @@ class QRCodeGeneratorApp(QMainWindow):
         self.stacked_widget.addWidget(self.wifi_mode_screen)
         self.stacked_widget.addWidget(self.vcard_mode_screen)
         self.stacked_widget.addWidget(self.preview_screen)
+        self.stacked_widget.addWidget(self.batch_mode_screen)
 
         # Show mode selection by default
         self.show_mode_selection()
@@ -163,6 +374,29 @@ class QRCodeGeneratorApp(QMainWindow):
         vcard_btn.clicked.connect(self.show_vcard_mode)
         layout.addWidget(vcard_btn)
 
+        # Batch Import Button
+        batch_btn = QPushButton('📊 Batch Import')
+        batch_btn.setFont(QFont('Segoe UI', 16, QFont.Weight.Bold))
+        batch_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        batch_btn.setMinimumHeight(120)
+        batch_btn.setStyleSheet(f'''
+            QPushButton {{
+                background-color: {self.batch_color};
+                color: white;
+                border: none;
+                border-radius: 12px;
+                padding: 20px;
+            }}
+            QPushButton:hover {{
+                background-color: #db2777;
+            }}
+            QPushButton:pressed {{
+                background-color: #be185d;
+            }}
+        ''')
+        batch_btn.clicked.connect(self.show_batch_mode)
+        layout.addWidget(batch_btn)
+
         layout.addStretch()
 
         return screen
@@ -224,6 +458,12 @@ class QRCodeGeneratorApp(QMainWindow):
         ''')
         input_layout.addWidget(self.url_text_entry)
 
+        # Short link checkbox
+        self.url_short_link_check = QCheckBox('Encode as a short link (destination can be changed later)')
+        self.url_short_link_check.setFont(QFont('Segoe UI', 10))
+        self.url_short_link_check.setStyleSheet(f'color: {self.text_color}; margin-bottom: 5px;')
+        input_layout.addWidget(self.url_short_link_check)
+
         # Preview button
         url_preview_btn = QPushButton('Preview QR Code')
         url_preview_btn.setFont(QFont('Segoe UI', 12, QFont.Weight.Bold))
@@ -561,6 +801,203 @@ class QRCodeGeneratorApp(QMainWindow):
 
         return screen
 
+    def create_batch_mode_screen(self):
+        '''Create the batch import screen'''
+        screen = QWidget()
+        screen.setStyleSheet(f'background-color: {self.bg_color};')
+        layout = QVBoxLayout(screen)
+        layout.setContentsMargins(30, 20, 30, 20)
+        layout.setSpacing(15)
+
+        # Back button
+        back_btn = QPushButton('← Back')
+        back_btn.setFont(QFont('Segoe UI', 11))
+        back_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        back_btn.setStyleSheet('''
+            QPushButton {
+                background-color: transparent;
+                color: #6b7280;
+                border: none;
+                text-align: left;
+                padding: 5px;
+            }
+            QPushButton:hover {
+                color: #374151;
+            }
+        ''')
+        back_btn.clicked.connect(self.close_batch_mode)
+        layout.addWidget(back_btn)
+
+        # Import card
+        batch_card = self.create_card()
+        batch_layout = QVBoxLayout(batch_card)
+        batch_layout.setContentsMargins(20, 20, 20, 20)
+        batch_layout.setSpacing(10)
+
+        file_label = QLabel('CSV Manifest')
+        file_label.setFont(QFont('Segoe UI', 11, QFont.Weight.Bold))
+        file_label.setStyleSheet(f'color: {self.text_color};')
+        batch_layout.addWidget(file_label)
+
+        action_button_style = f'''
+            QPushButton {{
+                background-color: {self.batch_color};
+                color: white;
+                border: none;
+                border-radius: 6px;
+                padding: 10px;
+            }}
+            QPushButton:hover {{
+                background-color: #db2777;
+            }}
+            QPushButton:pressed {{
+                background-color: #be185d;
+            }}
+            QPushButton:disabled {{
+                background-color: #f9a8d4;
+            }}
+        '''
+
+        file_row = QHBoxLayout()
+        self.batch_file_btn = QPushButton('📂 Choose CSV File')
+        self.batch_file_btn.setFont(QFont('Segoe UI', 11, QFont.Weight.Bold))
+        self.batch_file_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.batch_file_btn.setStyleSheet(action_button_style)
+        self.batch_file_btn.clicked.connect(self.choose_batch_manifest)
+        file_row.addWidget(self.batch_file_btn)
+
+        self.batch_file_label = QLabel('No file selected')
+        self.batch_file_label.setFont(QFont('Segoe UI', 10))
+        self.batch_file_label.setStyleSheet('color: #6b7280; border: none;')
+        file_row.addWidget(self.batch_file_label, 1)
+        batch_layout.addLayout(file_row)
+
+        # Progress
+        self.batch_progress = QProgressBar()
+        self.batch_progress.setTextVisible(True)
+        self.batch_progress.setStyleSheet(f'''
+            QProgressBar {{
+                border: 2px solid #e5e7eb;
+                border-radius: 6px;
+                background-color: white;
+                color: {self.text_color};
+                text-align: center;
+                min-height: 22px;
+            }}
+            QProgressBar::chunk {{
+                background-color: {self.batch_color};
+                border-radius: 4px;
+            }}
+        ''')
+        batch_layout.addWidget(self.batch_progress)
+
+        self.batch_status_label = QLabel('')
+        self.batch_status_label.setFont(QFont('Segoe UI', 10))
+        self.batch_status_label.setStyleSheet(f'color: {self.text_color}; border: none;')
+        batch_layout.addWidget(self.batch_status_label)
+
+        button_row = QHBoxLayout()
+        verify_row = QHBoxLayout()
+        verify_label = QLabel('Verify on export')
+        verify_label.setFont(QFont('Segoe UI', 10))
+        verify_label.setStyleSheet(f'color: {self.text_color}; border: none;')
+        verify_row.addWidget(verify_label)
+
+        self.batch_verify_combo = QComboBox()
+        self.batch_verify_combo.setFont(QFont('Segoe UI', 10))
+        self.batch_verify_combo.addItems(['Off', 'Sample 10%', 'All codes'])
+        self.batch_verify_combo.setStyleSheet(f'''
+            QComboBox {{
+                padding: 6px;
+                border: 2px solid #e5e7eb;
+                border-radius: 6px;
+                background-color: white;
+                color: {self.text_color};
+            }}
+            QComboBox QAbstractItemView {{
+                background-color: white;
+                color: {self.text_color};
+                selection-background-color: {self.batch_color};
+                selection-color: white;
+            }}
+        ''')
+        verify_row.addWidget(self.batch_verify_combo, 1)
+        batch_layout.addLayout(verify_row)
+
+        self.batch_cancel_btn = QPushButton('Cancel')
+        self.batch_export_btn = QPushButton('💾 Export All')
+        for button in (self.batch_cancel_btn, self.batch_export_btn):
+            button.setFont(QFont('Segoe UI', 11, QFont.Weight.Bold))
+            button.setCursor(Qt.CursorShape.PointingHandCursor)
+            button.setStyleSheet(action_button_style)
+            button_row.addWidget(button)
+        self.batch_cancel_btn.clicked.connect(self.cancel_batch)
+        self.batch_export_btn.clicked.connect(self.export_batch)
+        batch_layout.addLayout(button_row)
+
+        layout.addWidget(batch_card)
+
+        # Thumbnail grid
+        grid_card = self.create_card()
+        grid_layout = QVBoxLayout(grid_card)
+        grid_layout.setContentsMargins(15, 15, 15, 15)
+        grid_layout.setSpacing(10)
+
+        self.batch_model = BatchResultsModel()
+        self.batch_view = QListView()
+        self.batch_view.setModel(self.batch_model)
+        self.batch_view.setViewMode(QListView.ViewMode.IconMode)
+        self.batch_view.setResizeMode(QListView.ResizeMode.Adjust)
+        self.batch_view.setMovement(QListView.Movement.Static)
+        self.batch_view.setUniformItemSizes(True)
+        self.batch_view.setLayoutMode(QListView.LayoutMode.Batched)
+        self.batch_view.setIconSize(QSize(BatchResultsModel.THUMBNAIL_SIZE, BatchResultsModel.THUMBNAIL_SIZE))
+        self.batch_view.setGridSize(QSize(BatchResultsModel.THUMBNAIL_SIZE + 40, BatchResultsModel.THUMBNAIL_SIZE + 36))
+        self.batch_view.setStyleSheet(f'''
+            QListView {{
+                background-color: white;
+                border: 1px solid #e5e7eb;
+                border-radius: 6px;
+                color: {self.text_color};
+            }}
+        ''')
+        grid_layout.addWidget(self.batch_view, 1)
+
+        page_row = QHBoxLayout()
+        self.batch_prev_btn = QPushButton('◀ Prev')
+        self.batch_next_btn = QPushButton('Next ▶')
+        self.batch_page_label = QLabel('')
+        self.batch_page_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.batch_page_label.setStyleSheet(f'color: {self.text_color}; border: none;')
+        for button in (self.batch_prev_btn, self.batch_next_btn):
+            button.setFont(QFont('Segoe UI', 10))
+            button.setCursor(Qt.CursorShape.PointingHandCursor)
+            button.setStyleSheet(f'''
+                QPushButton {{
+                    background-color: white;
+                    color: {self.text_color};
+                    border: 2px solid #e5e7eb;
+                    border-radius: 6px;
+                    padding: 6px 12px;
+                }}
+                QPushButton:hover {{
+                    border: 2px solid {self.batch_color};
+                }}
+                QPushButton:disabled {{
+                    color: #9ca3af;
+                }}
+            ''')
+        self.batch_prev_btn.clicked.connect(lambda: self.set_batch_page(self.batch_model.page - 1))
+        self.batch_next_btn.clicked.connect(lambda: self.set_batch_page(self.batch_model.page + 1))
+        page_row.addWidget(self.batch_prev_btn)
+        page_row.addWidget(self.batch_page_label, 1)
+        page_row.addWidget(self.batch_next_btn)
+        grid_layout.addLayout(page_row)
+
+        layout.addWidget(grid_card, 1)
+
+        return screen
+
     def create_card(self):
         '''Create a card widget with modern styling'''
         card = QFrame()
@@ -573,6 +1010,26 @@ class QRCodeGeneratorApp(QMainWindow):
         ''')
         return card
 
+    def color_button_style(self, color):
+        '''Stylesheet for a style button showing its color as a swatch'''
+        text = 'white' if QColor(color).lightness() < 128 else self.text_color
+        return f'''
+            QPushButton {{
+                background-color: {color};
+                color: {text};
+                border: 2px solid #e5e7eb;
+                border-radius: 6px;
+                padding: 6px;
+            }}
+            QPushButton:hover {{
+                border: 2px solid {self.primary_color};
+            }}
+            QPushButton:disabled {{
+                background-color: #f3f4f6;
+                color: #9ca3af;
+            }}
+        '''
+
     def create_preview_screen(self):
         '''Create the QR code preview screen'''
         screen = QWidget()
@@ -613,10 +1070,23 @@ class QRCodeGeneratorApp(QMainWindow):
         self.preview_title.setStyleSheet(f'color: {self.text_color};')
         qr_layout.addWidget(self.preview_title)
 
+        # Short link details (hidden for other codes)
+        self.preview_subtitle = QLabel()
+        self.preview_subtitle.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.preview_subtitle.setFont(QFont('Segoe UI', 10))
+        self.preview_subtitle.setStyleSheet('color: #6b7280;')
+        self.preview_subtitle.setWordWrap(True)
+        self.preview_subtitle.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        self.preview_subtitle.hide()
+        qr_layout.addWidget(self.preview_subtitle)
+
         # QR Code display area
-        self.preview_qr_display = QLabel()
+        self.preview_qr_display = QRPreviewLabel()
         self.preview_qr_display.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.preview_qr_display.setMinimumHeight(400)
+        # The pixmap follows the label size, never the other way round
+        self.preview_qr_display.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        self.preview_qr_display.resized.connect(self.update_preview)
         self.preview_qr_display.setStyleSheet('''
             QLabel {
                 background-color: white;
@@ -626,6 +1096,98 @@ class QRCodeGeneratorApp(QMainWindow):
         ''')
         qr_layout.addWidget(self.preview_qr_display, 1)
 
+        # Style options
+        style_row = QHBoxLayout()
+        style_row.setSpacing(8)
+
+        self.fill_color_btn = QPushButton('Fill')
+        self.back_color_btn = QPushButton('Background')
+        self.gradient_color_btn = QPushButton('Gradient')
+        for button, attribute in (
+            (self.fill_color_btn, 'fill_color'),
+            (self.back_color_btn, 'back_color'),
+            (self.gradient_color_btn, 'gradient_color'),
+        ):
+            button.setFont(QFont('Segoe UI', 10))
+            button.setCursor(Qt.CursorShape.PointingHandCursor)
+            button.clicked.connect(lambda _, a=attribute: self.pick_style_color(a))
+
+        self.gradient_check = QCheckBox('Gradient')
+        self.gradient_check.setFont(QFont('Segoe UI', 10))
+        self.gradient_check.setStyleSheet(f'color: {self.text_color};')
+        self.gradient_check.stateChanged.connect(self.toggle_gradient)
+
+        combo_style = f'''
+            QComboBox {{
+                padding: 6px;
+                border: 2px solid #e5e7eb;
+                border-radius: 6px;
+                background-color: white;
+                color: {self.text_color};
+            }}
+            QComboBox QAbstractItemView {{
+                background-color: white;
+                color: {self.text_color};
+                selection-background-color: {self.primary_color};
+                selection-color: white;
+            }}
+        '''
+
+        self.shape_combo = QComboBox()
+        self.shape_combo.setFont(QFont('Segoe UI', 10))
+        self.shape_combo.addItems(['Square', 'Rounded', 'Dots'])
+        self.shape_combo.setStyleSheet(combo_style)
+        self.shape_combo.currentIndexChanged.connect(
+            lambda index: self.set_qr_style(module_shape=MODULE_SHAPES[index])
+        )
+
+        style_row.addWidget(self.fill_color_btn)
+        style_row.addWidget(self.back_color_btn)
+        style_row.addWidget(self.gradient_check)
+        style_row.addWidget(self.gradient_color_btn)
+        style_row.addWidget(self.shape_combo)
+        qr_layout.addLayout(style_row)
+
+        logo_row = QHBoxLayout()
+        logo_row.setSpacing(8)
+
+        self.logo_btn = QPushButton('🖼 Add Logo')
+        self.logo_clear_btn = QPushButton('Remove Logo')
+        for button in (self.logo_btn, self.logo_clear_btn):
+            button.setFont(QFont('Segoe UI', 10))
+            button.setCursor(Qt.CursorShape.PointingHandCursor)
+            button.setStyleSheet(f'''
+                QPushButton {{
+                    background-color: white;
+                    color: {self.text_color};
+                    border: 2px solid #e5e7eb;
+                    border-radius: 6px;
+                    padding: 6px;
+                }}
+                QPushButton:hover {{
+                    border: 2px solid {self.primary_color};
+                }}
+                QPushButton:disabled {{
+                    color: #9ca3af;
+                }}
+            ''')
+        self.logo_btn.clicked.connect(self.choose_logo)
+        self.logo_clear_btn.clicked.connect(lambda: self.set_qr_style(logo_path=None))
+
+        # One code, or a set of smaller linked codes (Structured Append)
+        self.split_combo = QComboBox()
+        self.split_combo.setFont(QFont('Segoe UI', 10))
+        self.split_combo.addItems(['Single code'] + [f'Codes up to v{v}' for v in SPLIT_VERSIONS[1:]])
+        self.split_combo.setStyleSheet(combo_style)
+        self.split_combo.currentIndexChanged.connect(self.set_split_version)
+
+        logo_row.addWidget(self.logo_btn, 1)
+        logo_row.addWidget(self.logo_clear_btn)
+        logo_row.addWidget(self.split_combo)
+        qr_layout.addLayout(logo_row)
+
+        self.refresh_style_controls()
+
         # Save button
         self.preview_save_btn = QPushButton('💾 Save QR Code')
         self.preview_save_btn.setFont(QFont('Segoe UI', 12, QFont.Weight.Bold))
@@ -668,7 +1230,8 @@ class QRCodeGeneratorApp(QMainWindow):
         self.current_mode = 'url'
         # Reset URL mode
         self.url_text_entry.clear()
-        self.qr_image = None
+        self.qr_matrix = None
+        self.qr_grid = None
 
     def show_wifi_mode(self):
         '''Show the WiFi mode screen'''
@@ -681,7 +1244,8 @@ class QRCodeGeneratorApp(QMainWindow):
         self.wifi_password_entry.clear()
         self.wifi_encryption_combo.setCurrentIndex(0)
         self.show_password_check.setChecked(False)
-        self.qr_image = None
+        self.qr_matrix = None
+        self.qr_grid = None
 
     def show_vcard_mode(self):
         '''Show the vCard mode screen'''
@@ -694,7 +1258,29 @@ class QRCodeGeneratorApp(QMainWindow):
         self.vcard_phone_entry.clear()
         self.vcard_email_entry.clear()
         self.vcard_org_entry.clear()
-        self.qr_image = None
+        self.qr_matrix = None
+        self.qr_grid = None
+
+    def show_batch_mode(self):
+        '''Show the batch import screen'''
+        self.stacked_widget.setCurrentWidget(self.batch_mode_screen)
+        self.title_label.setText('Batch Import')
+        self.header.setStyleSheet(f'background-color: {self.batch_color};')
+        self.current_mode = 'batch'
+
+        # Reset batch mode unless a run is still going
+        if not self.batch_running():
+            self.batch_manifest = None
+            self.batch_file_label.setText('No file selected')
+            self.batch_model.reset(0)
+            self.batch_progress.setValue(0)
+            self.batch_status_label.setText('')
+            self.update_batch_controls()
+
+    def close_batch_mode(self):
+        '''Leave batch mode, cancelling any run in progress'''
+        self.cancel_batch()
+        self.show_mode_selection()
 
     def close_preview(self):
         '''Close preview and return to the mode screen'''
@@ -717,108 +1303,55 @@ class QRCodeGeneratorApp(QMainWindow):
     def preview_qr_code(self, mode):
         '''Generate and preview QR code based on mode'''
         if mode == 'url':
-            data = self.url_text_entry.text().strip()
-
-            if not data:
-                QMessageBox.warning(self, 'Warning', 'Please enter text or URL for the QR code!')
-                return
-
+            fields = {'data': self.url_text_entry.text()}
             preview_title = 'URL/Text QR Code'
 
         elif mode == 'wifi':
-            ssid = self.wifi_ssid_entry.text().strip()
-            password = self.wifi_password_entry.text()
-            encryption_index = self.wifi_encryption_combo.currentIndex()
-
-            if not ssid:
-                QMessageBox.warning(self, 'Warning', 'Please enter WiFi network name (SSID)!')
-                return
-
-            # Map encryption type
-            encryption_map = {
-                0: 'WPA',  # WPA/WPA2
-                1: 'WEP',  # WEP
-                2: 'nopass'  # No Password
+            fields = {
+                'ssid': self.wifi_ssid_entry.text(),
+                'password': self.wifi_password_entry.text(),
+                'security': WIFI_SECURITY_TYPES[self.wifi_encryption_combo.currentIndex()],
             }
-            encryption = encryption_map[encryption_index]
-
-            # Create WiFi QR code data in standard format
-            # Format: WIFI:T:WPA;S:mynetwork;P:mypassword;;
-            if encryption == 'nopass':
-                data = f'WIFI:T:nopass;S:{ssid};;'
-            else:
-                if not password:
-                    QMessageBox.warning(self, 'Warning', 'Please enter WiFi password!')
-                    return
-                data = f'WIFI:T:{encryption};S:{ssid};P:{password};;'
-
             preview_title = 'WiFi QR Code'
 
         elif mode == 'vcard':
-            name = self.vcard_name_entry.text().strip()
-            phone = self.vcard_phone_entry.text().strip()
-            email = self.vcard_email_entry.text().strip()
-            org = self.vcard_org_entry.text().strip()
-
-            if not name:
-                QMessageBox.warning(self, 'Warning', 'Please enter at least a name for the vCard!')
-                return
-
-            # Create vCard QR code data in vCard 3.0 format
-            # Format: BEGIN:VCARD\nVERSION:3.0\nFN:Full Name\nTEL:Phone\nEMAIL:Email\nORG:Organization\nEND:VCARD
-            vcard_data = 'BEGIN:VCARD\n'
-            vcard_data += 'VERSION:3.0\n'
-            vcard_data += f'FN:{name}\n'
-
-            if phone:
-                vcard_data += f'TEL:{phone}\n'
-
-            if email:
-                vcard_data += f'EMAIL:{email}\n'
-
-            if org:
-                vcard_data += f'ORG:{org}\n'
-
-            vcard_data += 'END:VCARD'
-
-            data = vcard_data
+            fields = {
+                'name': self.vcard_name_entry.text(),
+                'phone': self.vcard_phone_entry.text(),
+                'email': self.vcard_email_entry.text(),
+                'org': self.vcard_org_entry.text(),
+            }
             preview_title = 'vCard QR Code'
 
         else:
             return
 
+        link_note = ''
         try:
-            # Create QR code
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_H,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(data)
-            qr.make(fit=True)
-
-            # Generate QR code image
-            self.qr_image = qr.make_image(fill_color='black', back_color='white')
-
-            # Convert PIL image to QPixmap
-            buffer = BytesIO()
-            self.qr_image.save(buffer, format='PNG')
-            buffer.seek(0)
-
-            qimage = QImage()
-            qimage.loadFromData(buffer.read())
-            pixmap = QPixmap.fromImage(qimage)
-
-            # Scale to fit display area while maintaining aspect ratio
-            scaled_pixmap = pixmap.scaled(
-                450, 450,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
+            data = build_payload(mode, fields)
+
+            if mode == 'url' and self.url_short_link_check.isChecked():
+                target = data
+                data = self.short_link_for(target)
+                preview_title = 'Short Link QR Code'
+                link_note = f'{data}\n→ {target}'
+                if is_loopback_base(self.short_base):
+                    link_note += (
+                        '\n⚠ Only this computer can open this link. '
+                        'Start the app with --short-base set to an address phones can reach.'
+                    )
+        except ValueError as e:
+            QMessageBox.warning(self, 'Warning', str(e))
+            return
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, 'Error', f'Failed to store short link: {str(e)}')
+            return
 
-            # Display QR code in preview screen
-            self.preview_qr_display.setPixmap(scaled_pixmap)
+        try:
+            # Create QR code
+            self.qr_data = data
+            self.qr_link_note = link_note
+            self.encode_qr_data()
             self.preview_title.setText(preview_title)
 
             # Show preview screen
@@ -836,38 +1369,524 @@ class QRCodeGeneratorApp(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, 'Error', f'Failed to generate QR code: {str(e)}')
 
+    def short_link_for(self, target):
+        '''Register a URL and return its short URL, serving links from this app'''
+        if self.link_registry is None:
+            self.link_registry = ShortLinkRegistry(self.links_db)
+
+        # Previewing the same URL again keeps its code; a new URL gets a new one
+        if self.last_short_link is None or self.last_short_link[0] != target:
+            self.last_short_link = (target, self.link_registry.shorten(target))
+        code = self.last_short_link[1]
+
+        if self.link_server is None:
+            try:
+                self.link_server = create_link_server(self.link_registry, *link_server_address(self.short_base))
+            except OSError:
+                # Already served by another instance, --serve-links or a remote host
+                pass
+            else:
+                threading.Thread(target=self.link_server.serve_forever, daemon=True).start()
+
+        return short_url(self.short_base, code)
+
+    def encode_qr_data(self):
+        '''Encode the current payload, split into linked codes when it is too large'''
+        self.qr_matrix, self.qr_grid = encode_symbols(self.qr_data, self.split_version, executor=self.encode_pool)
+        self.preview_cache.clear()
+        self.update_preview()
+
+        notes = [self.qr_link_note] if self.qr_link_note else []
+        if self.qr_grid.count > 1:
+            notes.append(f'{self.qr_grid.count} linked codes: scan them all, in any order')
+        self.preview_subtitle.setText('\n'.join(notes))
+        self.preview_subtitle.setVisible(bool(notes))
+
+    def set_split_version(self, index):
+        '''Re-encode the previewed payload with a new largest symbol version'''
+        previous = self.split_version
+        self.split_version = SPLIT_VERSIONS[index]
+
+        if self.qr_matrix is None:
+            return
+
+        try:
+            self.encode_qr_data()
+        except ValueError as e:
+            QMessageBox.warning(self, 'Warning', str(e))
+            self.split_combo.blockSignals(True)
+            self.split_combo.setCurrentIndex(SPLIT_VERSIONS.index(previous))
+            self.split_combo.blockSignals(False)
+            self.split_version = previous
+
+    def update_preview(self):
+        '''Render the cached matrix at the preview's device pixel size'''
+        if self.qr_matrix is None:
+            return
+
+        display = self.preview_qr_display
+        ratio = display.devicePixelRatioF()
+
+        # Leave room for the label border and keep whole pixels per module
+        available = max(min(display.width(), display.height()) - 4, 1)
+        target = int(available * ratio)
+        box_size = preview_box_size(max(len(self.qr_matrix), len(self.qr_matrix[0])), target)
+
+        key = (box_size, ratio, self.qr_style)
+        pixmap = self.preview_cache.get(key)
+
+        if pixmap is None:
+            image = render_matrix(self.qr_matrix, box_size, self.qr_style, self.qr_grid)
+            if max(image.size) > target:
+                # Big sheets of symbols have more modules than the preview has pixels
+                image = image.convert('RGB')
+                image.thumbnail((target, target), Image.Resampling.LANCZOS)
+            pixmap = pil_to_qpixmap(image)
+            pixmap.setDevicePixelRatio(ratio)
+            self.preview_cache[key] = pixmap
+
+            # Keep only the most recent sizes
+            if len(self.preview_cache) > 8:
+                del self.preview_cache[next(iter(self.preview_cache))]
+
+        display.setPixmap(pixmap)
+
+    def set_qr_style(self, **changes):
+        '''Apply style changes and re-render the preview from the cached matrix'''
+        self.qr_style = replace(self.qr_style, **changes)
+        self.preview_cache.clear()
+        self.refresh_style_controls()
+
+        try:
+            self.update_preview()
+        except Exception as e:
+            QMessageBox.critical(self, 'Error', f'Failed to apply style: {str(e)}')
+
+    def refresh_style_controls(self):
+        '''Sync the style controls with the current style'''
+        style = self.qr_style
+        for button, color in (
+            (self.fill_color_btn, style.fill_color),
+            (self.back_color_btn, style.back_color),
+            (self.gradient_color_btn, style.gradient_color or '#ffffff'),
+        ):
+            button.setStyleSheet(self.color_button_style(color))
+
+        self.gradient_check.blockSignals(True)
+        self.gradient_check.setChecked(style.gradient_color is not None)
+        self.gradient_check.blockSignals(False)
+        self.gradient_color_btn.setEnabled(style.gradient_color is not None)
+
+        self.shape_combo.blockSignals(True)
+        self.shape_combo.setCurrentIndex(MODULE_SHAPES.index(style.module_shape))
+        self.shape_combo.blockSignals(False)
+
+        if style.logo_path:
+            self.logo_btn.setText(f'🖼 {os.path.basename(style.logo_path)}')
+        else:
+            self.logo_btn.setText('🖼 Add Logo')
+        self.logo_clear_btn.setEnabled(style.logo_path is not None)
+
+    def pick_style_color(self, attribute):
+        '''Ask for a color and store it on the given style attribute'''
+        current = getattr(self.qr_style, attribute) or '#000000'
+        color = QColorDialog.getColor(QColor(current), self, 'Choose Color')
+
+        if color.isValid():
+            self.set_qr_style(**{attribute: color.name()})
+
+    def toggle_gradient(self, state):
+        '''Enable or disable the gradient fill'''
+        if state:
+            self.set_qr_style(gradient_color=self.secondary_color)
+        else:
+            self.set_qr_style(gradient_color=None)
+
+    def choose_logo(self):
+        '''Pick a logo image to place in the center of the QR code'''
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            'Choose Logo',
+            '',
+            'Images (*.png *.jpg *.jpeg *.bmp *.gif);;All Files (*.*)'
+        )
+
+        if file_path:
+            self.set_qr_style(logo_path=file_path)
+
+    def batch_running(self):
+        return self.batch_worker is not None and self.batch_worker.isRunning()
+
+    def update_batch_controls(self):
+        '''Enable batch buttons that make sense for the current state'''
+        running = self.batch_running()
+        has_results = any(result is not None for result in self.batch_model.results)
+        self.batch_file_btn.setEnabled(not running)
+        self.batch_cancel_btn.setEnabled(running)
+        self.batch_export_btn.setEnabled(has_results and not running)
+
+        page = self.batch_model.page
+        pages = self.batch_model.page_count()
+        self.batch_prev_btn.setEnabled(page > 0)
+        self.batch_next_btn.setEnabled(page < pages - 1)
+        self.batch_page_label.setText(f'Page {page + 1} of {pages}')
+
+    def set_batch_page(self, page):
+        self.batch_model.set_page(page)
+        self.batch_view.scrollToTop()
+        self.update_batch_controls()
+
+    def choose_batch_manifest(self):
+        '''Pick a manifest and start generating its codes'''
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            'Choose Manifest',
+            '',
+            'CSV Files (*.csv *.tsv *.txt);;All Files (*.*)'
+        )
+
+        if file_path:
+            self.start_batch(file_path)
+
+    def start_batch(self, manifest_path):
+        '''Encode every manifest row in background worker processes'''
+        try:
+            rows = read_manifest(manifest_path)
+        except Exception as e:
+            QMessageBox.critical(self, 'Error', f'Failed to read manifest: {str(e)}')
+            return
+
+        if not rows:
+            QMessageBox.warning(self, 'Warning', 'The manifest has no rows!')
+            return
+
+        self.batch_manifest = manifest_path
+        self.batch_file_label.setText(os.path.basename(manifest_path))
+        self.batch_model.reset(len(rows))
+        self.run_batch_worker(process_row, list(enumerate(rows, start=1)), (), 'Generating')
+
+    def export_batch(self):
+        '''Render and save every generated code to a folder'''
+        output_dir = QFileDialog.getExistingDirectory(self, 'Export QR Codes')
+
+        if not output_dir:
+            return
+
+        tasks = [
+            (result,) for result in self.batch_model.results
+            if result is not None and result.error is None
+        ]
+        verify_rate = (0, 0.1, 1)[self.batch_verify_combo.currentIndex()]
+        self.batch_export_dir = output_dir
+        options = ExportOptions(output_dir, EXPORT_BOX_SIZE, verify_rate, self.low_memory)
+        self.run_batch_worker(export_result, tasks, (options,), 'Exporting')
+
+    def run_batch_worker(self, func, tasks, args, action):
+        '''Start a BatchWorker and wire it to the progress widgets'''
+        if self.batch_running():
+            return
+
+        self.batch_action = action
+        self.batch_total = len(tasks)
+        self.batch_done = 0
+        self.batch_failed = 0
+        self.batch_verified = 0
+        self.batch_started = time.perf_counter()
+        self.batch_progress.setRange(0, max(self.batch_total, 1))
+        self.batch_progress.setValue(0)
+        self.batch_status_label.setText(f'{action}…')
+
+        worker = BatchWorker(func, tasks, args)
+        worker.results_ready.connect(lambda chunk: self.on_batch_results(worker, chunk))
+        worker.failed.connect(
+            lambda error: QMessageBox.critical(self, 'Error', f'Batch failed: {error}')
+        )
+        worker.finished.connect(lambda: self.on_batch_finished(worker))
+        self.batch_worker = worker
+        worker.start()
+        self.update_batch_controls()
+
+    def on_batch_results(self, worker, chunk):
+        '''Update progress, throughput and ETA as chunks complete'''
+        # Signals still queued from an earlier run are stale
+        if worker is not self.batch_worker:
+            return
+
+        self.batch_model.add_results(chunk)
+
+        self.batch_done += len(chunk)
+        self.batch_failed += sum(1 for result in chunk if result.error is not None)
+        self.batch_verified += sum(result.verified for result in chunk)
+        self.batch_progress.setValue(self.batch_done)
+
+        elapsed = time.perf_counter() - self.batch_started
+        rate = self.batch_done / elapsed if elapsed > 0 else 0
+        remaining = int((self.batch_total - self.batch_done) / rate) if rate else 0
+        self.batch_status_label.setText(
+            f'{self.batch_action} {self.batch_done:,} / {self.batch_total:,} · '
+            f'{rate:,.0f} codes/s · ETA {remaining // 60}:{remaining % 60:02d}'
+        )
+
+    def on_batch_finished(self, worker):
+        '''Summarize a finished or cancelled run'''
+        if worker is not self.batch_worker:
+            return
+
+        elapsed = time.perf_counter() - self.batch_started
+        state = 'Cancelled' if worker.cancel_event.is_set() else 'Done'
+        summary = (
+            f'{state}: {self.batch_done:,} / {self.batch_total:,} in {elapsed:.1f}s, '
+            f'{self.batch_failed:,} failed'
+        )
+        if self.batch_verified:
+            summary += f', {self.batch_verified:,} verified'
+        self.batch_status_label.setText(summary)
+        self.update_batch_controls()
+
+        if self.batch_action == 'Exporting' and not worker.cancel_event.is_set():
+            message = f'Exported {self.batch_done - self.batch_failed:,} QR code(s) to:\n{self.batch_export_dir}'
+            if self.batch_failed:
+                message += f'\n\n{self.batch_failed:,} code(s) failed to save or verify (shown in red).'
+            QMessageBox.information(self, 'Success', message)
+
+    def cancel_batch(self):
+        if self.batch_running():
+            self.batch_worker.cancel()
+
+    def closeEvent(self, event):
+        # Don't leave worker processes behind
+        if self.batch_running():
+            self.batch_worker.cancel()
+            self.batch_worker.wait()
+        if self.link_server is not None:
+            self.link_server.shutdown()
+            self.link_server.server_close()
+        if self.encode_pool is not None:
+            self.encode_pool.shutdown(wait=False, cancel_futures=True)
+        super().closeEvent(event)
+
     def save_qr_code(self):
-        if not self.qr_image:
+        if self.qr_matrix is None:
             QMessageBox.warning(self, 'Warning', 'No QR code to save!')
             return
 
         # Open native file dialog (PyQt6 uses native dialogs on all platforms)
-        file_path, _ = QFileDialog.getSaveFileName(
+        file_path, selected_filter = QFileDialog.getSaveFileName(
             self,
             'Save QR Code',
             'qrcode.png',
-            'PNG Files (*.png);;JPEG Files (*.jpg);;All Files (*.*)'
+            'PNG Files (*.png);;JPEG Files (*.jpg);;SVG Files (*.svg);;'
+            f'{BUNDLE_FILTER};;All Files (*.*)'
         )
 
         if file_path:
             try:
-                self.qr_image.save(file_path)
-                QMessageBox.information(self, 'Success', f'QR Code saved to:\n{file_path}')
+                if selected_filter == BUNDLE_FILTER:
+                    # Siblings named after the chosen file: .png, .svg and _thumb.jpg
+                    paths, _ = export_formats(
+                        self.qr_matrix, os.path.splitext(file_path)[0], parse_formats('png,svg,thumb'),
+                        self.qr_style, EXPORT_BOX_SIZE, self.low_memory, self.qr_grid
+                    )
+                elif os.path.splitext(file_path)[1].lower() == '.svg':
+                    write_svg(self.qr_matrix, file_path, EXPORT_BOX_SIZE, self.qr_style, self.qr_grid)
+                    paths = [file_path]
+                else:
+                    save_matrix(
+                        self.qr_matrix, file_path, EXPORT_BOX_SIZE, self.qr_style, self.low_memory, self.qr_grid
+                    )
+                    paths = [file_path]
+                saved = '\n'.join(paths)
+                QMessageBox.information(self, 'Success', f'QR Code saved to:\n{saved}')
             except Exception as e:
                 QMessageBox.critical(self, 'Error', f'Failed to save QR code: {str(e)}')
 
 
+def positive_int(value):
+    '''argparse type for counts and sizes that must be at least 1'''
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'expected a positive whole number, got {value!r}')
+    return number
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='QR Code Generator')
+    parser.add_argument(
+        '--batch', metavar='MANIFEST',
+        help='generate codes from a CSV manifest without opening the GUI'
+    )
+    parser.add_argument(
+        '--output', metavar='DIR', default='qrcodes',
+        help='output folder for --batch (default: qrcodes)'
+    )
+    parser.add_argument(
+        '--box-size', type=positive_int, default=EXPORT_BOX_SIZE,
+        help=f'pixels per module for --batch (default: {EXPORT_BOX_SIZE})'
+    )
+    parser.add_argument(
+        '--verify', metavar='FRACTION', type=float, nargs='?', const=1.0, default=0.0,
+        help='decode every saved code back and compare it with its payload; '
+             'pass a fraction (e.g. 0.1) to check a random sample'
+    )
+    parser.add_argument(
+        '--workers', type=positive_int, default=None,
+        help='worker processes for --batch (default: one per CPU)'
+    )
+    parser.add_argument(
+        '--low-memory', action='store_true',
+        help='stream PNGs to disk in strips instead of holding full-size images'
+    )
+    parser.add_argument(
+        '--formats', metavar='LIST',
+        help='comma-separated export formats for --batch, each with an optional '
+             '@BOX_SIZE (e.g. png,svg,thumb or png,png@30); a manifest '
+             '"formats" column overrides it per row'
+    )
+    parser.add_argument(
+        '--short-base', metavar='URL',
+        help=f'address printed in short-link codes (default: this computer\'s '
+             f'network address on port {SHORT_LINK_PORT}, e.g. http://192.168.1.10:{SHORT_LINK_PORT})'
+    )
+    parser.add_argument(
+        '--links-db', metavar='PATH', default=SHORT_LINK_DB,
+        help='short-link database (default: ~/.qr_code_generator/links.sqlite3)'
+    )
+    parser.add_argument(
+        '--serve-links', metavar='HOST:PORT', nargs='?', const='',
+        help='run only the short-link redirect server (default: the host and '
+             'port of --short-base)'
+    )
+    parser.add_argument(
+        '--update-link', metavar=('CODE', 'URL'), nargs=2,
+        help='point an existing short link at a new URL'
+    )
+    parser.add_argument(
+        '--profile', metavar='PREFIX',
+        help='profile the --batch run and write PREFIX.pstats, PREFIX.txt and '
+             'PREFIX.collapsed (flame graph stacks tagged by pipeline stage)'
+    )
+    # Leave Qt's own options (e.g. -platform) for QApplication
+    args, qt_args = parser.parse_known_args(argv)
+
+    if args.profile and not args.batch:
+        parser.error('--profile requires --batch')
+
+    if args.short_base is None:
+        args.short_base = default_short_base()
+
+    if args.serve_links is not None:
+        default_host, default_port = link_server_address(args.short_base)
+        host, _, port = args.serve_links.rpartition(':')
+        if port and not port.isdigit():
+            parser.error('--serve-links expects HOST:PORT or PORT')
+        args.serve_links = (host or default_host, int(port) if port else default_port)
+
+    if args.formats is not None:
+        try:
+            args.formats = parse_formats(args.formats)
+        except ValueError as e:
+            parser.error(str(e))
+
+    return args, qt_args
+
+
+def run_batch_cli(args):
+    try:
+        options = ExportOptions(
+            args.output, args.box_size, args.verify, args.low_memory, args.formats,
+            export_workers=1 if args.profile else None
+        )
+
+        if args.profile:
+            # Profilers only see this thread, so run every row and export in it
+            (saved, verified, failures), stages = run_profiled(
+                lambda: run_manifest(args.batch, options, workers=1), args.profile
+            )
+        else:
+            saved, verified, failures = run_manifest(args.batch, options, args.workers)
+    except OSError as e:
+        print(f'Failed to read manifest: {e}', file=sys.stderr)
+        return 2
+
+    for number, error in failures:
+        print(f'Row {number}: {error}', file=sys.stderr)
+
+    print(f'Saved {saved} QR code(s) to {args.output}')
+    if args.verify:
+        print(f'Verified {verified} QR code(s) by decoding them back')
+
+    if args.profile:
+        total = sum(stages.values()) or 1
+        print(f'Profile written to {args.profile}.pstats, .txt and .collapsed')
+        for stage, count in stages.most_common():
+            print(f'  {stage:<8} {count * 100 / total:5.1f}%')
+    return 1 if failures else 0
+
+
+def run_links_cli(args):
+    try:
+        registry = ShortLinkRegistry(args.links_db)
+    except (OSError, sqlite3.Error) as e:
+        print(f'Failed to open short-link database: {e}', file=sys.stderr)
+        return 2
+
+    try:
+        if args.update_link:
+            code, target = args.update_link
+            registry.update(code, target)
+            print(f'{short_url(args.short_base, code.upper())} now redirects to {target.strip()}')
+
+        if not args.serve_links:
+            return 0
+
+        host, port = args.serve_links
+        try:
+            server = create_link_server(registry, host, port)
+        except OSError as e:
+            print(f'Failed to start server on {host}:{port}: {e}', file=sys.stderr)
+            return 2
+
+        print(f'Serving short links on http://{host}:{port} (Ctrl+C to stop)')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return 0
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        registry.close()
+
+
 def main():
-    app = QApplication(sys.argv)
+    args, qt_args = parse_args(sys.argv[1:])
+
+    if args.batch:
+        sys.exit(run_batch_cli(args))
+
+    if args.serve_links or args.update_link:
+        sys.exit(run_links_cli(args))
+
+    app = QApplication(sys.argv[:1] + qt_args)
 
     # Set application-wide font
     app.setFont(QFont('Segoe UI', 10))
 
-    window = QRCodeGeneratorApp()
+    window = QRCodeGeneratorApp(
+        low_memory=args.low_memory, links_db=args.links_db, short_base=args.short_base
+    )
     window.show()
 
     sys.exit(app.exec())
 
 
 if __name__ == '__main__':
+    # Needed for worker processes in PyInstaller builds
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,138 @@
+'''URL, WiFi and vCard payloads: validation, escaping and parsing'''
+import re
+
+
+WIFI_SECURITY_TYPES = ('WPA', 'WEP', 'nopass')
+
+# Characters that need a backslash escape inside WIFI: and vCard values
+WIFI_SPECIAL = '\\;,:"'
+VCARD_SPECIAL = '\\;,'
+VCARD_KEYS = (('name', 'FN'), ('phone', 'TEL'), ('email', 'EMAIL'), ('org', 'ORG'))
+
+
+def payload_fields(mode, fields):
+    '''Validate and normalize the fields a mode encodes, raising ValueError on missing input'''
+    if mode == 'url':
+        data = fields.get('data', '').strip()
+
+        if not data:
+            raise ValueError('Please enter text or URL for the QR code!')
+
+        return {'data': data}
+
+    if mode == 'wifi':
+        ssid = fields.get('ssid', '').strip()
+        password = fields.get('password', '')
+        encryption = fields.get('security', 'WPA') or 'WPA'
+
+        if not ssid:
+            raise ValueError('Please enter WiFi network name (SSID)!')
+
+        if encryption not in WIFI_SECURITY_TYPES:
+            raise ValueError(f'Unknown WiFi security type: {encryption}')
+
+        if encryption == 'nopass':
+            password = ''
+        elif not password:
+            raise ValueError('Please enter WiFi password!')
+
+        return {'security': encryption, 'ssid': ssid, 'password': password}
+
+    if mode == 'vcard':
+        values = {key: fields.get(key, '').strip() for key, _ in VCARD_KEYS}
+
+        if not values['name']:
+            raise ValueError('Please enter at least a name for the vCard!')
+
+        return values
+
+    raise ValueError(f'Unknown QR code mode: {mode}')
+
+
+def _escape(value, special):
+    return ''.join('\\' + char if char in special else char for char in value)
+
+
+def format_payload(mode, values):
+    '''Encode normalized fields (see payload_fields) as QR code text'''
+    if mode == 'wifi':
+        # Create WiFi QR code data in standard format
+        # Format: WIFI:T:WPA;S:mynetwork;P:mypassword;;
+        ssid = _escape(values['ssid'], WIFI_SPECIAL)
+
+        if values['security'] == 'nopass':
+            return f'WIFI:T:nopass;S:{ssid};;'
+
+        return f'WIFI:T:{values["security"]};S:{ssid};P:{_escape(values["password"], WIFI_SPECIAL)};;'
+
+    if mode == 'vcard':
+        # Create vCard QR code data in vCard 3.0 format
+        # Format: BEGIN:VCARD\nVERSION:3.0\nFN:Full Name\nTEL:Phone\nEMAIL:Email\nORG:Organization\nEND:VCARD
+        vcard_data = 'BEGIN:VCARD\n'
+        vcard_data += 'VERSION:3.0\n'
+
+        for key, prefix in VCARD_KEYS:
+            if values[key]:
+                value = _escape(values[key], VCARD_SPECIAL).replace('\r\n', '\n').replace('\n', '\\n')
+                vcard_data += f'{prefix}:{value}\n'
+
+        vcard_data += 'END:VCARD'
+
+        return vcard_data
+
+    return values['data']
+
+
+def build_payload(mode, fields):
+    '''Build the QR code payload for a mode, raising ValueError on missing input'''
+    return format_payload(mode, payload_fields(mode, fields))
+
+
+def _split_escaped(text, separator):
+    '''Split on unescaped separators, keeping escapes in the parts'''
+    parts = ['']
+    escaped = False
+
+    for char in text:
+        if escaped:
+            parts[-1] += char
+            escaped = False
+        elif char == '\\':
+            parts[-1] += char
+            escaped = True
+        elif char == separator:
+            parts.append('')
+        else:
+            parts[-1] += char
+
+    return parts
+
+
+def _unescape(value):
+    return re.sub(r'\\(.)', lambda match: '\n' if match.group(1) in 'nN' else match.group(1), value)
+
+
+def parse_payload(mode, text):
+    '''Parse QR code text back into the fields payload_fields produces'''
+    if mode == 'wifi':
+        if not text.startswith('WIFI:'):
+            return None
+
+        values = {'security': 'WPA', 'ssid': '', 'password': ''}
+        keys = {'T': 'security', 'S': 'ssid', 'P': 'password'}
+        for part in _split_escaped(text[5:], ';'):
+            key, separator, value = part.partition(':')
+            if separator and key in keys:
+                values[keys[key]] = value if key == 'T' else _unescape(value)
+        return values
+
+    if mode == 'vcard':
+        values = {key: '' for key, _ in VCARD_KEYS}
+        keys = {prefix: key for key, prefix in VCARD_KEYS}
+        for line in text.split('\n'):
+            prefix, separator, value = line.partition(':')
+            if separator and prefix in keys:
+                values[keys[prefix]] = _unescape(value)
+        return values
+
+    return {'data': text}
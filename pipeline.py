@@ -0,0 +1,165 @@
+'''Pipeline stage tags, worker-process batches and the profiler'''
+import os
+import sys
+import multiprocessing
+import threading
+import cProfile
+import pstats
+from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, as_completed, wait
+
+
+# Current pipeline stage per thread, read by the sampling profiler
+_thread_stages = {}
+
+
+@contextmanager
+def pipeline_stage(name):
+    '''Tag the current thread's work with a pipeline stage for profiling'''
+    thread = threading.get_ident()
+    previous = _thread_stages.get(thread)
+    _thread_stages[thread] = name
+
+    try:
+        yield
+    finally:
+        if previous is None:
+            _thread_stages.pop(thread, None)
+        else:
+            _thread_stages[thread] = previous
+
+
+# Set in each worker process so running chunks can stop between rows
+_cancel_event = None
+
+
+def _init_worker(cancel_event):
+    global _cancel_event
+    _cancel_event = cancel_event
+
+
+def _run_chunk(func, chunk, args, cancel_event=None):
+    '''Worker entry point: apply func to a chunk of tasks until cancelled'''
+    cancel_event = cancel_event or _cancel_event
+    results = []
+
+    for task in chunk:
+        if cancel_event is not None and cancel_event.is_set():
+            break
+        results.append(func(*task, *args))
+
+    return results
+
+
+def iter_batch(func, tasks, args=(), workers=None, chunk_size=32, cancel_event=None):
+    '''Run func(*task, *args) for every task in worker processes
+
+    Results are yielded in chunks as they complete. Only a few chunks are in
+    flight at a time so huge manifests do not queue every task up front, and
+    closing the generator cancels the remaining work. Setting cancel_event (a
+    multiprocessing event) also stops the chunks that are already running
+    before their next task.
+    '''
+    workers = workers or os.cpu_count() or 1
+    chunks = (tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size))
+
+    if workers == 1:
+        for chunk in chunks:
+            yield _run_chunk(func, chunk, args, cancel_event)
+        return
+
+    # Spawned workers are safe to start from the GUI's worker thread
+    executor = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker, initargs=(cancel_event,)
+    )
+    pending = set()
+
+    try:
+        for chunk in chunks:
+            pending.add(executor.submit(_run_chunk, func, chunk, args))
+
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+        for future in as_completed(pending):
+            yield future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class StackSampler:
+    '''Samples one thread's Python stack at a fixed interval
+
+    Stacks are kept in collapsed form ("stage;outer;...;inner") with the
+    thread's pipeline stage as the root frame, ready for flame graph tools.
+    '''
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+
+            stage = _thread_stages.get(self.thread_id, 'other')
+            self.stacks[';'.join([stage] + names[::-1])] += 1
+
+    def stage_totals(self):
+        '''Sample counts per pipeline stage'''
+        totals = Counter()
+        for stack, count in self.stacks.items():
+            totals[stack.split(';', 1)[0]] += count
+        return totals
+
+    def write_collapsed(self, path):
+        with open(path, 'w', encoding='utf-8') as collapsed:
+            for stack, count in sorted(self.stacks.items()):
+                collapsed.write(f'{stack} {count}\n')
+
+
+def run_profiled(func, prefix, interval=0.005):
+    '''Run func under cProfile and the stack sampler; returns (result, stage totals)
+
+    Writes <prefix>.pstats (for pstats/snakeviz), <prefix>.txt (top functions
+    by cumulative time) and <prefix>.collapsed (for flamegraph.pl/speedscope).
+    '''
+    sampler = StackSampler(threading.get_ident(), interval)
+    profiler = cProfile.Profile()
+    sampler.start()
+    profiler.enable()
+
+    try:
+        result = func()
+    finally:
+        profiler.disable()
+        sampler.stop()
+
+    profiler.dump_stats(f'{prefix}.pstats')
+    with open(f'{prefix}.txt', 'w', encoding='utf-8') as report:
+        pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(60)
+    sampler.write_collapsed(f'{prefix}.collapsed')
+
+    return result, sampler.stage_totals()
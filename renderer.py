@@ -0,0 +1,593 @@
+'''Styled rendering of module matrices and export to PNG, JPEG and SVG'''
+import os
+import zlib
+import struct
+import re
+import base64
+from dataclasses import dataclass
+from functools import lru_cache
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageChops, ImageColor, ImageDraw
+
+from encoder import QR_BORDER, single_symbol
+from pipeline import pipeline_stage
+
+
+EXPORT_BOX_SIZE = 10
+
+MODULE_SHAPES = ('square', 'rounded', 'dot')
+
+# Share of the symbol width covered by a logo; ERROR_CORRECT_H recovers ~30%
+LOGO_RATIO = 0.22
+
+
+@dataclass(frozen=True)
+class QRStyle:
+    '''Visual options applied when rendering a QR code matrix'''
+    fill_color: str = 'black'
+    back_color: str = 'white'
+    module_shape: str = 'square'
+    gradient_color: str | None = None
+    logo_path: str | None = None
+
+    def is_plain(self):
+        '''True when the style matches the classic black-on-white square output'''
+        return self == QRStyle()
+
+    def is_flat(self):
+        '''True when the output only blends the fill and background colors'''
+        return not self.gradient_color and not self.logo_path
+
+
+@lru_cache(maxsize=64)
+def _module_sprites(shape, box_size):
+    '''Precompute the 8-bit coverage sprites for one module shape and size
+
+    Rounded modules only round a corner when both neighbours on that corner
+    are light, so sprites are keyed by a 4-bit neighbour mask
+    (1 = up, 2 = right, 4 = down, 8 = left).
+    '''
+    if shape == 'square':
+        return {0: Image.new('L', (box_size, box_size), 255)}
+
+    # Draw at 4x and downsample for anti-aliased edges
+    scale = 4
+    size = box_size * scale
+    sprites = {}
+
+    if shape == 'dot':
+        sprite = Image.new('L', (size, size), 0)
+        margin = size // 10
+        ImageDraw.Draw(sprite).ellipse(
+            (margin, margin, size - margin - 1, size - margin - 1), fill=255
+        )
+        sprites[0] = sprite.resize((box_size, box_size), Image.Resampling.LANCZOS)
+        return sprites
+
+    half = size // 2
+    quadrants = ((0, 0), (half, 0), (half, half), (0, half))
+
+    for neighbours in range(16):
+        up, right, down, left = (bool(neighbours & bit) for bit in (1, 2, 4, 8))
+        rounded = (not (up or left), not (up or right), not (down or right), not (down or left))
+
+        # Clear the rounded quadrants, then the inscribed circle restores their curve
+        sprite = Image.new('L', (size, size), 255)
+        draw = ImageDraw.Draw(sprite)
+        for (x, y), corner in zip(quadrants, rounded):
+            if corner:
+                draw.rectangle((x, y, x + half - 1, y + half - 1), fill=0)
+        draw.ellipse((0, 0, size - 1, size - 1), fill=255)
+
+        sprites[neighbours] = sprite.resize((box_size, box_size), Image.Resampling.LANCZOS)
+
+    return sprites
+
+
+@lru_cache(maxsize=32)
+def _gradient_ramp(size):
+    '''One pixel high 0-255 ramp from left to right'''
+    return Image.linear_gradient('L').transpose(Image.Transpose.ROTATE_90).resize(
+        (size, 1), Image.Resampling.BILINEAR
+    )
+
+
+def _fill_region(width, full_height, top, height, fill_color, gradient_color):
+    '''Foreground for pixel rows top..top+height of a width x full_height image
+
+    A solid fill is returned as the color itself, which paste() fills with
+    directly instead of through a full-size layer.
+    '''
+    if not gradient_color:
+        return fill_color
+
+    # Diagonal gradient: average of a horizontal and a vertical ramp
+    horizontal = _gradient_ramp(width).resize((width, height), Image.Resampling.NEAREST)
+    vertical = _gradient_ramp(full_height).crop((top, 0, top + height, 1)).transpose(
+        Image.Transpose.TRANSPOSE
+    ).resize((width, height), Image.Resampling.NEAREST)
+    start = Image.new('RGB', (width, height), fill_color)
+    end = Image.new('RGB', (width, height), gradient_color)
+    return Image.composite(end, start, ImageChops.add(horizontal, vertical, scale=2.0))
+
+
+@lru_cache(maxsize=16)
+def _logo_layer(logo_path, mtime, size):
+    '''Load and resize a logo into an RGBA tile, cached per file version and size'''
+    with Image.open(logo_path) as logo:
+        logo = logo.convert('RGBA')
+        logo.thumbnail((size, size), Image.Resampling.LANCZOS)
+
+    tile = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    tile.paste(logo, ((size - logo.width) // 2, (size - logo.height) // 2))
+    return tile
+
+
+def _logo_span(module_count):
+    '''Start and length (in modules) of the centered square reserved for a logo'''
+    inner = module_count - 2 * QR_BORDER
+    span = int(inner * LOGO_RATIO)
+
+    # Keep the span the same parity as the symbol so it sits exactly centered
+    if span % 2 != inner % 2:
+        span -= 1
+
+    return (module_count - span) // 2, span
+
+
+def _is_finder_module(row, col, module_count):
+    '''True when the module belongs to one of the three finder patterns'''
+    low = QR_BORDER
+    high = module_count - QR_BORDER - 7
+    in_rows = (low <= row < low + 7, high <= row < high + 7)
+    in_cols = (low <= col < low + 7, high <= col < high + 7)
+    return (in_rows[0] and in_cols[0]) or (in_rows[0] and in_cols[1]) or (in_rows[1] and in_cols[0])
+
+
+def _module_mask(matrix, box_size, shape, first, last, grid):
+    '''Render the dark-module coverage mask for module rows first..last
+
+    Works on whole images instead of pasting a sprite per module: the dark
+    modules are scaled up once, and each shape detail (a dot, or one rounded
+    corner) is one tiled sprite applied through a stencil of the modules that
+    need it. Rounding a corner only depends on the two modules next to it.
+    '''
+    count = len(matrix)
+    columns = len(matrix[0])
+    width = columns * box_size
+    height = (last - first) * box_size
+
+    # One module of context above and below so strips round like the full image
+    top = max(first - 1, 0)
+    bottom = min(last + 1, count)
+    raw = bytes(255 if cell else 0 for row in matrix[top:bottom] for cell in row)
+    dark = Image.frombytes('L', (columns, bottom - top), raw)
+    window = (0, first - top, columns, first - top + last - first)
+
+    def scaled(small):
+        return small.crop(window).resize((width, height), Image.Resampling.NEAREST)
+
+    if shape == 'square':
+        return scaled(dark)
+
+    if shape == 'dot':
+        # Finder patterns stay solid so scanners can lock on
+        far = grid.size - 2 * QR_BORDER - 7
+        finders = Image.new('L', dark.size, 0)
+        draw = ImageDraw.Draw(finders)
+        for symbol_top, symbol_left in grid.origins():
+            for row, col in ((0, 0), (0, far), (far, 0)):
+                y = symbol_top + QR_BORDER + row - top
+                x = symbol_left + QR_BORDER + col
+                draw.rectangle((x, y, x + 6, y + 6), fill=255)
+        finders = ImageChops.darker(finders, dark)
+
+        dots = ImageChops.darker(_tile(_module_sprites('dot', box_size)[0], width, height), scaled(dark))
+        return ImageChops.lighter(dots, scaled(finders))
+
+    # Neighbours moved onto each module; the wrapped edges are quiet zone
+    up = ImageChops.offset(dark, 0, 1)
+    down = ImageChops.offset(dark, 0, -1)
+    left = ImageChops.offset(dark, 1, 0)
+    right = ImageChops.offset(dark, -1, 0)
+    light = ImageChops.invert(dark)
+    sprites = _module_sprites('rounded', box_size)
+    mask = scaled(dark)
+
+    # Sprite key with only that corner rounded, and the neighbours that keep it square
+    for key, first_side, second_side in ((6, up, left), (12, up, right), (9, down, right), (3, down, left)):
+        square = ImageChops.lighter(light, ImageChops.lighter(first_side, second_side))
+        corner = ImageChops.lighter(_tile(sprites[key], width, height), scaled(square))
+        mask = ImageChops.darker(mask, corner)
+
+    return mask
+
+
+def _tile(sprite, width, height):
+    '''Repeat a sprite over width x height pixels by doubling the tiled area'''
+    tiled = Image.new('L', (width, height))
+    tiled.paste(sprite, (0, 0))
+    filled_width, filled_height = sprite.size
+
+    while filled_width < width:
+        tiled.paste(tiled.crop((0, 0, filled_width, filled_height)), (filled_width, 0))
+        filled_width *= 2
+    while filled_height < height:
+        tiled.paste(tiled.crop((0, 0, width, filled_height)), (0, filled_height))
+        filled_height *= 2
+
+    return tiled
+
+
+def _clear_logo_area(matrix, style, grid):
+    '''Clear the modules behind the logo; error correction restores them'''
+    if not style.logo_path:
+        return matrix
+
+    start, span = _logo_span(grid.size)
+    matrix = [list(row) for row in matrix]
+    for top, left in grid.origins():
+        for r in range(top + start, top + start + span):
+            matrix[r][left + start:left + start + span] = [False] * span
+    return matrix
+
+
+@lru_cache(maxsize=32)
+def _blend_palette(fill_color, back_color):
+    '''Palette where entry i is the fill color at coverage i over the background'''
+    fill = ImageColor.getrgb(fill_color)[:3]
+    back = ImageColor.getrgb(back_color)[:3]
+    return [
+        back_channel + ((fill_channel - back_channel) * i + 127) // 255
+        for i in range(256)
+        for fill_channel, back_channel in zip(fill, back)
+    ]
+
+
+def _render_rows(matrix, box_size, style, first, last, fill, grid):
+    '''Render module rows first..last of a (logo-cleared) matrix'''
+    columns = len(matrix[0])
+    width = columns * box_size
+    height = (last - first) * box_size
+
+    if style.is_plain():
+        # Same 1-bit output as qrcode's default image factory
+        raw = bytes(0 if cell else 255 for row in matrix[first:last] for cell in row)
+        small = Image.frombytes('L', (columns, last - first), raw)
+        scaled = small.resize((width, height), Image.Resampling.NEAREST)
+        with pipeline_stage('convert'):
+            return scaled.convert('1')
+
+    mask = _module_mask(matrix, box_size, style.module_shape, first, last, grid)
+
+    if style.is_flat():
+        # A palette of the 256 blends encodes several times faster than RGB
+        with pipeline_stage('convert'):
+            image = Image.frombytes('P', mask.size, mask.tobytes())
+            image.putpalette(_blend_palette(style.fill_color, style.back_color))
+            return image
+
+    image = Image.new('RGB', (width, height), style.back_color)
+    image.paste(fill, (0, 0), mask)
+    del mask
+
+    if style.logo_path:
+        start, span = _logo_span(grid.size)
+        # Leave a one-module margin inside the cleared area
+        logo_size = max((span - 2) * box_size, 1)
+        top = first * box_size
+
+        for symbol_top, symbol_left in grid.origins():
+            x = (symbol_left + start + 1) * box_size
+            y = (symbol_top + start + 1) * box_size
+
+            if y < top + height and y + logo_size > top:
+                logo = _logo_layer(style.logo_path, os.path.getmtime(style.logo_path), logo_size)
+                image.paste(logo, (x, y - top), logo)
+
+    return image
+
+
+def render_matrix(matrix, box_size=EXPORT_BOX_SIZE, style=QRStyle(), grid=None):
+    '''Render a module matrix (one symbol unless a grid is given) using the given style'''
+    grid = grid or single_symbol(matrix)
+    count = len(matrix)
+    fill = None
+    if not style.is_flat():
+        # Built per render: a cache of full-size layers would pin one per image size
+        height = count * box_size
+        fill = _fill_region(len(matrix[0]) * box_size, height, 0, height, style.fill_color, style.gradient_color)
+    return _render_rows(_clear_logo_area(matrix, style, grid), box_size, style, 0, count, fill, grid)
+
+
+def iter_render_strips(matrix, box_size=EXPORT_BOX_SIZE, style=QRStyle(), rows_per_strip=4, grid=None):
+    '''Render a matrix as horizontal strips; only one strip is alive at a time'''
+    grid = grid or single_symbol(matrix)
+    count = len(matrix)
+    width = len(matrix[0]) * box_size
+    matrix = _clear_logo_area(matrix, style, grid)
+
+    for first in range(0, count, rows_per_strip):
+        last = min(first + rows_per_strip, count)
+        fill = None
+        if not style.is_flat():
+            fill = _fill_region(
+                width, count * box_size, first * box_size, (last - first) * box_size,
+                style.fill_color, style.gradient_color
+            )
+        yield _render_rows(matrix, box_size, style, first, last, fill, grid)
+
+
+def _png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def write_png_strips(path, strips, width, height):
+    '''Stream '1', 'P' or 'RGB' strips into a PNG file without a full-size raster'''
+    strips = iter(strips)
+    with pipeline_stage('render'):
+        strip = next(strips)
+    bit_depth, color_type = {'1': (1, 0), 'P': (8, 3)}.get(strip.mode, (8, 2))
+    compressor = zlib.compressobj(6)
+
+    with open(path, 'wb') as png:
+        png.write(b'\x89PNG\r\n\x1a\n')
+        png.write(_png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, bit_depth, color_type, 0, 0, 0)))
+        if strip.mode == 'P':
+            png.write(_png_chunk(b'PLTE', bytes(strip.getpalette()[:768])))
+
+        while strip is not None:
+            with pipeline_stage('convert'):
+                data = strip.tobytes()
+                stride = len(data) // strip.height
+                # Filter type 0 (none) in front of every scanline
+                scanlines = b''.join(b'\x00' + data[i:i + stride] for i in range(0, len(data), stride))
+                del data
+
+            with pipeline_stage('save'):
+                compressed = compressor.compress(scanlines)
+                if compressed:
+                    png.write(_png_chunk(b'IDAT', compressed))
+
+            with pipeline_stage('render'):
+                strip = next(strips, None)
+
+        png.write(_png_chunk(b'IDAT', compressor.flush()))
+        png.write(_png_chunk(b'IEND', b''))
+
+
+def save_matrix(matrix, path, box_size=EXPORT_BOX_SIZE, style=QRStyle(), low_memory=False, grid=None):
+    '''Render and save a matrix, returning the image (None when streamed)
+
+    In low-memory mode PNGs are streamed strip by strip to the file. Other
+    formats need the whole raster for their encoder and are rendered normally.
+    '''
+    if low_memory and os.path.splitext(path)[1].lower() == '.png':
+        write_png_strips(
+            path, iter_render_strips(matrix, box_size, style, grid=grid),
+            len(matrix[0]) * box_size, len(matrix) * box_size
+        )
+        return None
+
+    with pipeline_stage('render'):
+        image = render_matrix(matrix, box_size, style, grid)
+
+    with pipeline_stage('save'):
+        pil_format = Image.registered_extensions().get(os.path.splitext(path)[1].lower())
+        _encodable(image, pil_format).save(path)
+
+    return image
+
+
+def _encodable(image, pil_format):
+    '''Palette images as RGB for JPEG, which has no palette mode'''
+    if pil_format == 'JPEG' and image.mode == 'P':
+        return image.convert('RGB')
+    return image
+
+
+# Export formats: name -> (PIL format, file suffix)
+EXPORT_FORMATS = {
+    'png': ('PNG', '.png'),
+    'jpg': ('JPEG', '.jpg'),
+    'svg': ('SVG', '.svg'),
+    'thumb': ('JPEG', '_thumb.jpg'),
+}
+
+# Target width of the 'thumb' format
+THUMBNAIL_PIXELS = 128
+
+
+def parse_formats(spec):
+    '''Parse "png,svg,thumb" (or ; | separated, optional @box_size) into targets'''
+    targets = []
+
+    for item in re.split(r'[,;|\s]+', spec.strip().lower()):
+        if not item:
+            continue
+
+        name, _, box = item.partition('@')
+        name = {'jpeg': 'jpg'}.get(name, name)
+        if name not in EXPORT_FORMATS:
+            raise ValueError(f'Unknown export format: {name}')
+
+        if box and (not box.isdigit() or int(box) < 1):
+            raise ValueError(f'Invalid box size for {name}: {box}')
+
+        targets.append((name, int(box) if box else None))
+
+    return tuple(targets)
+
+
+def export_path(stem, name, box_size=None):
+    '''File path for one export target; explicit sizes get an @box suffix'''
+    suffix = EXPORT_FORMATS[name][1]
+    return f'{stem}@{box_size}{suffix}' if box_size else f'{stem}{suffix}'
+
+
+def _svg_module_path(x, y, rounded):
+    '''SVG path for one module with the given (tl, tr, br, bl) corners rounded'''
+    r = 0.5
+    tl, tr, br, bl = rounded
+    return (
+        f'M{x + (r if tl else 0)} {y}'
+        f'H{x + 1 - (r if tr else 0)}' + (f'a{r} {r} 0 0 1 {r} {r}' if tr else '') +
+        f'V{y + 1 - (r if br else 0)}' + (f'a{r} {r} 0 0 1 -{r} {r}' if br else '') +
+        f'H{x + (r if bl else 0)}' + (f'a{r} {r} 0 0 1 -{r} -{r}' if bl else '') +
+        f'V{y + (r if tl else 0)}' + (f'a{r} {r} 0 0 1 {r} -{r}' if tl else '') + 'z'
+    )
+
+
+def write_svg(matrix, path, box_size=EXPORT_BOX_SIZE, style=QRStyle(), grid=None):
+    '''Write a matrix as a vector SVG (one unit per module)'''
+    grid = grid or single_symbol(matrix)
+    count = len(matrix)
+    columns = len(matrix[0])
+    symbol = grid.size
+    matrix = _clear_logo_area(matrix, style, grid)
+    shapes = []
+
+    for r, row in enumerate(matrix):
+        c = 0
+        while c < columns:
+            if not row[c]:
+                c += 1
+                continue
+
+            if style.module_shape == 'square' or (
+                style.module_shape == 'dot' and _is_finder_module(r % symbol, c % symbol, symbol)
+            ):
+                # Merge horizontal runs of square modules
+                end = c
+                while end < columns and row[end] and (
+                    style.module_shape == 'square' or _is_finder_module(r % symbol, end % symbol, symbol)
+                ):
+                    end += 1
+                shapes.append(f'M{c} {r}h{end - c}v1h-{end - c}z')
+                c = end
+                continue
+
+            if style.module_shape == 'dot':
+                shapes.append(f'M{c + 0.1} {r + 0.5}a0.4 0.4 0 1 0 0.8 0a0.4 0.4 0 1 0 -0.8 0z')
+            else:
+                up = r > 0 and matrix[r - 1][c]
+                right = c < columns - 1 and row[c + 1]
+                down = r < count - 1 and matrix[r + 1][c]
+                left = c > 0 and row[c - 1]
+                shapes.append(_svg_module_path(c, r, (
+                    not (up or left), not (up or right), not (down or right), not (down or left)
+                )))
+            c += 1
+
+    fill = style.fill_color
+    defs = ''
+    if style.gradient_color:
+        fill = 'url(#fill)'
+        defs = (
+            f'<defs><linearGradient id="fill" gradientUnits="userSpaceOnUse" '
+            f'x1="0" y1="0" x2="{columns}" y2="{count}">'
+            f'<stop offset="0" stop-color="{style.fill_color}"/>'
+            f'<stop offset="1" stop-color="{style.gradient_color}"/>'
+            f'</linearGradient></defs>'
+        )
+
+    with open(path, 'w', encoding='utf-8') as svg:
+        svg.write(
+            f'<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<svg xmlns="http://www.w3.org/2000/svg" '
+            f'width="{columns * box_size}" height="{count * box_size}" '
+            f'viewBox="0 0 {columns} {count}" shape-rendering="geometricPrecision">\n'
+            f'{defs}<rect width="{columns}" height="{count}" fill="{style.back_color}"/>\n'
+            f'<path fill="{fill}" d="'
+        )
+        svg.writelines(shapes)
+        svg.write('"/>\n')
+
+        if style.logo_path:
+            start, span = _logo_span(symbol)
+            logo = _logo_layer(style.logo_path, os.path.getmtime(style.logo_path), max((span - 2) * box_size, 1))
+            buffer = BytesIO()
+            logo.save(buffer, format='PNG')
+            encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
+            for top, left in grid.origins():
+                svg.write(
+                    f'<image x="{left + start + 1}" y="{top + start + 1}" '
+                    f'width="{span - 2}" height="{span - 2}" '
+                    f'href="data:image/png;base64,{encoded}"/>\n'
+                )
+
+        svg.write('</svg>\n')
+
+
+def _save_raster(image, path, name, fit=None):
+    '''Encode one rendered raster, scaled down to fit pixels when given'''
+    pil_format = EXPORT_FORMATS[name][0]
+    if fit and max(image.size) > fit:
+        # Sheets of many symbols are too big for one pixel per module
+        image = image.convert('RGB')
+        image.thumbnail((fit, fit), Image.Resampling.LANCZOS)
+
+    with pipeline_stage('save'):
+        if pil_format == 'JPEG':
+            _encodable(image, pil_format).save(path, pil_format, quality=90)
+        else:
+            image.save(path, pil_format)
+
+
+def export_formats(
+    matrix, stem, targets, style=QRStyle(), box_size=EXPORT_BOX_SIZE, low_memory=False, grid=None, workers=None
+):
+    '''Save one encoded matrix to several formats and sizes concurrently
+
+    Every raster size is rendered once and shared by all targets of that size,
+    and the encoders run in a thread pool (Pillow and zlib release the GIL
+    while compressing). With workers=1 everything runs in the calling thread,
+    which is what profilers watch. Returns (paths, rasters by box size).
+    '''
+    count = max(len(matrix), len(matrix[0]))
+    jobs = []
+
+    for name, explicit_box in targets:
+        box = explicit_box
+        if box is None:
+            box = preview_box_size(count, THUMBNAIL_PIXELS) if name == 'thumb' else box_size
+        jobs.append((name, box, export_path(stem, name, explicit_box), explicit_box))
+
+    raster_sizes = sorted({
+        box for name, box, _, _ in jobs
+        if name != 'svg' and not (low_memory and name == 'png')
+    })
+
+    def render(box):
+        with pipeline_stage('render'):
+            return render_matrix(matrix, box, style, grid)
+
+    def save(job):
+        name, box, path, explicit_box = job
+        if name == 'svg':
+            with pipeline_stage('save'):
+                write_svg(matrix, path, box, style, grid)
+        elif box not in rasters:
+            save_matrix(matrix, path, box, style, True, grid)
+        else:
+            fit = THUMBNAIL_PIXELS if name == 'thumb' and explicit_box is None else None
+            _save_raster(rasters[box], path, name, fit)
+
+    workers = workers or max(1, min(len(jobs), 4))
+    if workers == 1:
+        rasters = {box: render(box) for box in raster_sizes}
+        for job in jobs:
+            save(job)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            rasters = dict(zip(raster_sizes, pool.map(render, raster_sizes)))
+            # Consuming the results re-raises the first failed save
+            list(pool.map(save, jobs))
+
+    return [path for _, _, path, _ in jobs], rasters
+
+
+def preview_box_size(module_count, target_pixels):
+    '''Largest whole number of device pixels per module that fits the target'''
+    return max(1, target_pixels // module_count)
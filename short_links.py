@@ -0,0 +1,152 @@
+'''Short links: a local registry that maps short codes to long URLs, and its redirect server'''
+import os
+import time
+import threading
+import sqlite3
+import secrets
+import socket
+import ipaddress
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+SHORT_LINK_DB = os.path.join(os.path.expanduser('~'), '.qr_code_generator', 'links.sqlite3')
+SHORT_LINK_PORT = 8765
+# Digits and capitals only, so the whole short URL fits QR alphanumeric mode
+SHORT_CODE_ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+SHORT_CODE_LENGTH = 6
+
+
+class ShortLinkRegistry:
+    '''SQLite store of short code -> target URL, safe to share between threads'''
+
+    def __init__(self, path=SHORT_LINK_DB):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS links ('
+                'code TEXT PRIMARY KEY, target TEXT NOT NULL, '
+                'created REAL NOT NULL, updated REAL NOT NULL)'
+            )
+            # Finding the codes that point at a URL
+            self.db.execute('CREATE INDEX IF NOT EXISTS links_target ON links (target)')
+
+    def shorten(self, target):
+        '''New code for a URL
+
+        Every call gets its own code, even for a URL shortened before, so
+        repointing one printed code never moves another.
+        '''
+        target = check_link_target(target)
+
+        with self.lock, self.db:
+            now = time.time()
+            while True:
+                code = ''.join(secrets.choice(SHORT_CODE_ALPHABET) for _ in range(SHORT_CODE_LENGTH))
+                try:
+                    self.db.execute('INSERT INTO links VALUES (?, ?, ?, ?)', (code, target, now, now))
+                    return code
+                except sqlite3.IntegrityError:
+                    continue
+
+    def resolve(self, code):
+        '''Target URL for a code, or None'''
+        with self.lock:
+            row = self.db.execute('SELECT target FROM links WHERE code = ?', (code.upper(),)).fetchone()
+        return row[0] if row else None
+
+    def update(self, code, target):
+        '''Point an existing code at a new URL (printed codes follow it)'''
+        target = check_link_target(target)
+
+        with self.lock, self.db:
+            cursor = self.db.execute(
+                'UPDATE links SET target = ?, updated = ? WHERE code = ?',
+                (target, time.time(), code.upper())
+            )
+        if cursor.rowcount == 0:
+            raise ValueError(f'Unknown short link: {code}')
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def check_link_target(target):
+    '''Return a stripped http(s) URL or raise ValueError'''
+    target = target.strip()
+    parts = urlsplit(target)
+    if parts.scheme.lower() not in ('http', 'https') or not parts.netloc:
+        raise ValueError('Short links need a URL starting with http:// or https://')
+    return target
+
+
+def lan_address():
+    '''This computer's address on the local network (127.0.0.1 when offline)'''
+    try:
+        # Connecting a UDP socket only picks the outgoing interface; nothing is sent
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+            probe.connect(('10.255.255.255', 1))
+            return probe.getsockname()[0]
+    except OSError:
+        return '127.0.0.1'
+
+
+def default_short_base():
+    '''Short-link base URL that phones on the same network can reach'''
+    return f'http://{lan_address()}:{SHORT_LINK_PORT}'
+
+
+def is_loopback_base(base):
+    '''True when only this computer can open links under base'''
+    host = urlsplit(base).hostname or ''
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host == 'localhost'
+
+
+def link_server_address(base):
+    '''(host, port) that serves links under base'''
+    parts = urlsplit(base)
+    return parts.hostname, parts.port or (443 if parts.scheme.lower() == 'https' else 80)
+
+
+def short_url(base, code):
+    '''Short URL for a code'''
+    parts = urlsplit(base)
+    # Scheme and host are case-insensitive; capitals let them use alphanumeric mode
+    return f'{parts.scheme.upper()}://{parts.netloc.upper()}{parts.path.rstrip("/")}/{code}'
+
+
+class ShortLinkHandler(BaseHTTPRequestHandler):
+    '''Answers GET /<code> with a redirect to the registered target'''
+    registry = None
+
+    def do_GET(self):
+        target = self.registry.resolve(urlsplit(self.path).path.strip('/'))
+
+        if target is None:
+            self.send_error(404, 'Unknown short link')
+            return
+
+        # 302 rather than 301 so browsers don't cache a destination that may change
+        self.send_response(302)
+        self.send_header('Location', target)
+        self.send_header('Cache-Control', 'no-store')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    do_HEAD = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_link_server(registry, host, port):
+    '''HTTP server redirecting short links; call serve_forever() to run it'''
+    handler = type('RegistryHandler', (ShortLinkHandler,), {'registry': registry})
+    return ThreadingHTTPServer((host, port), handler)
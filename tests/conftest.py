@@ -0,0 +1,20 @@
+import os
+
+import pytest
+
+# Qt tests run without a display
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def window(qapp):
+    from main import QRCodeGeneratorApp
+    window = QRCodeGeneratorApp(links_db=':memory:', short_base='http://127.0.0.1:8765')
+    yield window
+    window.close()
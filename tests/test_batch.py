@@ -0,0 +1,20 @@
+import threading
+
+from pipeline import iter_batch
+
+
+def test_cancel_stops_before_the_next_row():
+    cancel_event = threading.Event()
+    calls = []
+
+    def work(number):
+        calls.append(number)
+        if number == 3:
+            cancel_event.set()
+        return number
+
+    tasks = [(number,) for number in range(1, 11)]
+    chunks = list(iter_batch(work, tasks, workers=1, chunk_size=4, cancel_event=cancel_event))
+
+    assert calls == [1, 2, 3]
+    assert [number for chunk in chunks for number in chunk] == [1, 2, 3]
@@ -0,0 +1,22 @@
+import pytest
+
+from main import parse_args
+from renderer import EXPORT_BOX_SIZE
+
+
+@pytest.mark.parametrize('option', ['--workers', '--box-size'])
+@pytest.mark.parametrize('value', ['0', '-2', 'two', '1.5'])
+def test_counts_must_be_positive(capsys, option, value):
+    with pytest.raises(SystemExit) as exit_info:
+        parse_args(['--batch', 'manifest.csv', option, value])
+
+    assert exit_info.value.code == 2
+    assert 'positive whole number' in capsys.readouterr().err
+
+
+def test_counts_parse():
+    args, _ = parse_args(['--batch', 'manifest.csv', '--workers', '3', '--box-size', '4'])
+    assert (args.workers, args.box_size) == (3, 4)
+
+    args, _ = parse_args(['--batch', 'manifest.csv'])
+    assert (args.workers, args.box_size) == (None, EXPORT_BOX_SIZE)
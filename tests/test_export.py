@@ -0,0 +1,85 @@
+import pytest
+from PIL import Image, ImageChops
+
+import renderer
+from encoder import encode_matrix
+from renderer import (
+    QRStyle, THUMBNAIL_PIXELS, export_formats, export_path, parse_formats, preview_box_size, render_matrix
+)
+
+STYLE = QRStyle(module_shape='rounded', fill_color='#1e3a8a')
+
+
+@pytest.mark.parametrize('spec, expected', [
+    ('png,svg,thumb', (('png', None), ('svg', None), ('thumb', None))),
+    ('PNG; jpeg | png@30', (('png', None), ('jpg', None), ('png', 30))),
+    (' svg ', (('svg', None),)),
+])
+def test_parse_formats(spec, expected):
+    assert parse_formats(spec) == expected
+
+
+@pytest.mark.parametrize('spec', ['gif', 'png@0', 'png@x', 'svg@-1', 'png,bmp'])
+def test_parse_formats_rejects_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        parse_formats(spec)
+
+
+@pytest.mark.parametrize('name, box_size, expected', [
+    ('png', None, 'out/code.png'),
+    ('svg', None, 'out/code.svg'),
+    ('thumb', None, 'out/code_thumb.jpg'),
+    ('jpg', None, 'out/code.jpg'),
+    ('png', 30, 'out/code@30.png'),
+    ('thumb', 2, 'out/code@2_thumb.jpg'),
+])
+def test_export_path(name, box_size, expected):
+    assert export_path('out/code', name, box_size) == expected
+
+
+def test_export_siblings_and_sizes(tmp_path):
+    matrix = encode_matrix('https://example.com')
+    stem = str(tmp_path / 'code')
+
+    paths, _ = export_formats(matrix, stem, parse_formats('png,svg,thumb,png@30'), STYLE)
+
+    assert paths == [f'{stem}.png', f'{stem}.svg', f'{stem}_thumb.jpg', f'{stem}@30.png']
+    with Image.open(paths[0]) as png:
+        assert png.size == (len(matrix) * 10,) * 2
+    with Image.open(paths[2]) as thumb:
+        assert thumb.format == 'JPEG' and max(thumb.size) <= THUMBNAIL_PIXELS
+    with Image.open(paths[3]) as large:
+        assert large.size == (len(matrix) * 30,) * 2
+    assert open(paths[1], encoding='utf-8').read().startswith('<?xml')
+
+
+@pytest.mark.parametrize('workers', [None, 1])
+def test_one_raster_per_box_size(tmp_path, monkeypatch, workers):
+    matrix = encode_matrix('https://example.com')
+    rendered = []
+
+    def counting_render(*args):
+        rendered.append(args[1])
+        return render_matrix(*args)
+
+    monkeypatch.setattr(renderer, 'render_matrix', counting_render)
+    _, rasters = export_formats(
+        matrix, str(tmp_path / 'code'), parse_formats('png,jpg,thumb,png@4,jpg@4'), STYLE, workers=workers
+    )
+
+    thumb_box = preview_box_size(len(matrix), THUMBNAIL_PIXELS)
+    assert sorted(rendered) == sorted({10, 4, thumb_box})
+    assert set(rasters) == {10, 4, thumb_box}
+
+
+def test_low_memory_png_with_raster_targets(tmp_path):
+    matrix = encode_matrix('https://example.com/' + 'x' * 100)
+    stem = str(tmp_path / 'code')
+
+    paths, rasters = export_formats(matrix, stem, parse_formats('png,thumb,jpg@3'), STYLE, low_memory=True)
+
+    # The full-size PNG is streamed, the smaller rasters are rendered
+    assert 10 not in rasters and 3 in rasters
+    with Image.open(paths[0]) as streamed:
+        full = render_matrix(matrix, 10, STYLE).convert('RGB')
+        assert ImageChops.difference(streamed.convert('RGB'), full).getbbox() is None
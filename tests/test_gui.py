@@ -0,0 +1,149 @@
+import pytest
+from PIL import Image
+
+import main
+from batch import process_row
+from encoder import encode_symbols
+from main import BUNDLE_FILTER, BatchResultsModel
+from renderer import preview_box_size
+
+
+@pytest.fixture
+def preview(window, monkeypatch):
+    renders = []
+
+    def counting_render(*args):
+        renders.append(args[1])
+        return render_matrix(*args)
+
+    render_matrix = main.render_matrix
+    monkeypatch.setattr(main, 'render_matrix', counting_render)
+
+    window.resize(700, 900)
+    window.show()
+    window.show_url_mode()
+    window.url_text_entry.setText('https://example.com/preview')
+    window.preview_qr_code('url')
+    main.QApplication.processEvents()
+    return window, renders
+
+
+def resize(window, width, height):
+    window.resize(width, height)
+    main.QApplication.processEvents()
+
+
+def check_pixmap(window):
+    display = window.preview_qr_display
+    pixmap = display.pixmap()
+    ratio = display.devicePixelRatioF()
+    modules = len(window.qr_matrix)
+    box_size = preview_box_size(modules, int((min(display.width(), display.height()) - 4) * ratio))
+
+    assert pixmap.width() == pixmap.height() == modules * box_size
+    assert pixmap.width() <= display.width() * ratio and pixmap.height() <= display.height() * ratio
+    assert pixmap.devicePixelRatio() == ratio
+    return box_size
+
+
+def test_preview_follows_the_label_size(preview):
+    window, renders = preview
+
+    resize(window, 700, 900)
+    large = check_pixmap(window)
+    resize(window, 520, 640)
+    small = check_pixmap(window)
+
+    assert small < large
+    assert renders[-1] == small
+
+
+def test_earlier_size_reuses_the_cache(preview):
+    window, renders = preview
+
+    resize(window, 700, 900)
+    first = check_pixmap(window)
+    resize(window, 520, 640)
+    check_pixmap(window)
+    count = len(renders)
+
+    resize(window, 700, 900)
+    assert check_pixmap(window) == first
+    assert len(renders) == count
+
+
+@pytest.mark.parametrize('name, selected_filter, expected', [
+    ('code.jpeg', 'JPEG Files (*.jpg)', ['code.jpeg']),
+    ('code.bmp', 'All Files (*.*)', ['code.bmp']),
+    ('code.svg', 'SVG Files (*.svg)', ['code.svg']),
+    ('code.png', BUNDLE_FILTER, ['code.png', 'code.svg', 'code_thumb.jpg']),
+])
+def test_save_dialog_uses_the_chosen_path(window, tmp_path, monkeypatch, name, selected_filter, expected):
+    messages = []
+    monkeypatch.setattr(main.QFileDialog, 'getSaveFileName', lambda *args: (str(tmp_path / name), selected_filter))
+    monkeypatch.setattr(main.QMessageBox, 'information', lambda *args: messages.append(args[2]))
+    monkeypatch.setattr(main.QMessageBox, 'critical', lambda *args: messages.append(args[2]))
+    window.qr_matrix, window.qr_grid = encode_symbols('https://example.com')
+
+    window.save_qr_code()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(expected)
+    assert messages and messages[0].startswith('QR Code saved')
+    if name.endswith('.bmp'):
+        with Image.open(tmp_path / name) as saved:
+            assert saved.format == 'BMP'
+
+
+def results(numbers):
+    return [process_row(number, {'data': f'https://example.com/{number}'}) for number in numbers]
+
+
+@pytest.fixture
+def model(qapp):
+    model = BatchResultsModel()
+    model.PAGE_SIZE = 3
+    model.THUMBNAIL_CACHE = 2
+    model.reset(8)
+    return model
+
+
+def test_paging(model):
+    assert model.page_count() == 3
+    assert model.rowCount() == 3
+
+    model.set_page(2)
+    assert model.rowCount() == 2
+
+    model.set_page(10)
+    assert model.page == 2
+    model.set_page(-1)
+    assert model.page == 0
+
+
+def test_add_results_only_refreshes_the_current_page(model):
+    changed = []
+    model.dataChanged.connect(lambda first, last: changed.append((first.row(), last.row())))
+
+    model.add_results(results([5, 7]))
+    assert changed == []
+    assert [result.number for result in model.results if result] == [5, 7]
+
+    model.add_results(results([2, 3, 8]))
+    assert changed == [(1, 2)]
+
+    model.set_page(1)
+    assert model.data(model.index(1)) == model.results[4].filename
+
+
+def test_thumbnail_cache_is_bounded(model):
+    rows = results(range(1, 6))
+    model.add_results(rows)
+
+    for result in rows:
+        pixmap = model.thumbnail(result)
+        assert not pixmap.isNull()
+        assert len(model.thumbnails) <= model.THUMBNAIL_CACHE
+
+    assert list(model.thumbnails) == [4, 5]
+    assert model.thumbnail(rows[3]) is model.thumbnails[4]
+    assert list(model.thumbnails) == [5, 4]
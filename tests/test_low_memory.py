@@ -0,0 +1,92 @@
+import gc
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image, ImageChops
+
+from encoder import encode_matrix
+from renderer import QRStyle, iter_render_strips, render_matrix, save_matrix, write_png_strips
+
+ROOT = Path(__file__).resolve().parent.parent
+
+STYLES = [
+    QRStyle(),
+    QRStyle(fill_color='#1e3a8a', back_color='#fef3c7', module_shape='rounded'),
+    QRStyle(module_shape='dot', gradient_color='#ec4899'),
+]
+
+# Peak RSS growth (KiB) of one version-40/H save at 10 px per module. VmHWM
+# starts over in the new process; ru_maxrss would carry over pytest's own peak
+PEAK_SCRIPT = '''
+import sys
+from encoder import encode_matrix
+from renderer import QRStyle, save_matrix
+
+def peak():
+    with open('/proc/self/status') as status:
+        return next(int(line.split()[1]) for line in status if line.startswith('VmHWM'))
+
+matrix = encode_matrix('x' * 1200)
+style = QRStyle(module_shape='rounded', gradient_color='#ec4899')
+save_matrix(matrix, sys.argv[1] + '/warmup.png', 1, style)
+before = peak()
+save_matrix(matrix, sys.argv[1] + '/code.png', 10, style, sys.argv[2] == 'low')
+print(peak() - before)
+'''
+
+
+@pytest.mark.parametrize('style', STYLES)
+def test_streamed_png_matches_full_render(tmp_path, style):
+    matrix = encode_matrix('https://example.com/' + 'x' * 300)
+    box_size = 7
+    size = len(matrix) * box_size
+
+    write_png_strips(tmp_path / 'strips.png', iter_render_strips(matrix, box_size, style), size, size)
+
+    with Image.open(tmp_path / 'strips.png') as streamed:
+        full = render_matrix(matrix, box_size, style).convert('RGB')
+        assert ImageChops.difference(streamed.convert('RGB'), full).getbbox() is None
+
+
+def test_renders_keep_no_full_size_layers(tmp_path):
+    logo = tmp_path / 'logo.png'
+    Image.new('RGB', (16, 16), 'red').save(logo)
+    matrix = encode_matrix('https://example.com/' + 'x' * 300)
+
+    for style in (QRStyle(gradient_color='#ec4899'), QRStyle(logo_path=str(logo))):
+        for box_size in (3, 4, 5):
+            render_matrix(matrix, box_size, style)
+
+    gc.collect()
+    smallest = (len(matrix) * 3) ** 2
+    assert not [
+        obj for obj in gc.get_objects()
+        if isinstance(obj, Image.Image) and obj.width * obj.height >= smallest
+    ]
+
+
+def test_low_memory_save_returns_no_raster(tmp_path):
+    matrix = encode_matrix('hello')
+    assert save_matrix(matrix, tmp_path / 'code.png', 10, QRStyle(), low_memory=True) is None
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/status'), reason='needs /proc')
+def test_low_memory_peak(tmp_path):
+    def peak(mode):
+        output = subprocess.run(
+            [sys.executable, '-c', PEAK_SCRIPT, str(tmp_path), mode],
+            capture_output=True, text=True, check=True,
+            env={**os.environ, 'PYTHONPATH': str(ROOT)}
+        )
+        return int(output.stdout.split()[-1])
+
+    normal = peak('normal')
+    low = peak('low')
+
+    # Documented: 49 MB normally, about 2 MB streamed
+    assert normal > 20 * 1024
+    assert low < normal / 8
+
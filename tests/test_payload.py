@@ -0,0 +1,39 @@
+import pytest
+
+from decoder import verify_image
+from encoder import encode_matrix
+from payloads import build_payload, parse_payload, payload_fields
+from renderer import render_matrix
+
+
+@pytest.mark.parametrize('mode, fields, expected', [
+    ('wifi', {'ssid': 'home;net', 'password': 'p:w'}, r'WIFI:T:WPA;S:home\;net;P:p\:w;;'),
+    ('wifi', {'ssid': r'a,b"c\d', 'security': 'nopass'}, r'WIFI:T:nopass;S:a\,b\"c\\d;;'),
+    ('vcard', {'name': 'Doe; John, Jr.', 'org': 'Line 1\nLine 2'},
+     'BEGIN:VCARD\nVERSION:3.0\n' r'FN:Doe\; John\, Jr.' '\n' r'ORG:Line 1\nLine 2' '\nEND:VCARD'),
+])
+def test_special_characters_are_escaped(mode, fields, expected):
+    assert build_payload(mode, fields) == expected
+
+
+@pytest.mark.parametrize('mode, fields', [
+    ('url', {'data': 'https://example.com/?a=1;b=2'}),
+    ('wifi', {'ssid': 'home;net', 'password': r'p:w\;,"', 'security': 'WEP'}),
+    ('wifi', {'ssid': 'Cafe', 'password': 'ignored', 'security': 'nopass'}),
+    ('vcard', {'name': 'Doe, John', 'phone': '+1 555', 'email': 'j@example.com', 'org': 'A\\B;C'}),
+])
+def test_parse_payload_round_trip(mode, fields):
+    values = payload_fields(mode, fields)
+    assert parse_payload(mode, build_payload(mode, fields)) == values
+
+
+def test_verification_catches_unescaped_wifi_payload():
+    fields = payload_fields('wifi', {'ssid': 'home;net', 'password': 'p:w'})
+    broken = 'WIFI:T:WPA;S:home;net;P:p:w;;'
+    image = render_matrix(encode_matrix(broken), 4)
+
+    assert verify_image(image, broken, mode='wifi', fields=fields) is not None
+
+    payload = build_payload('wifi', fields)
+    image = render_matrix(encode_matrix(payload), 4)
+    assert verify_image(image, payload, mode='wifi', fields=fields) is None
@@ -0,0 +1,67 @@
+import csv
+import os
+import re
+
+from batch import ExportOptions, run_manifest
+from main import parse_args, run_batch_cli
+from pipeline import run_profiled
+
+STAGES = {'payload', 'encode', 'mask', 'render', 'convert', 'save', 'export', 'verify', 'other'}
+
+
+def write_manifest(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as manifest:
+        writer = csv.DictWriter(manifest, fieldnames=['data', 'filename', 'module_shape', 'gradient_color'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def collapsed_stages(path):
+    stages = set()
+    with open(path, encoding='utf-8') as collapsed:
+        for line in collapsed:
+            stages.add(line.split(';', 1)[0])
+    return stages
+
+
+def test_run_profiled_writes_reports(tmp_path):
+    manifest = tmp_path / 'manifest.csv'
+    write_manifest(manifest, [
+        {'data': 'https://example.com/a', 'filename': 'a.png', 'module_shape': 'dot'},
+        {'data': 'https://example.com/b', 'filename': 'b.png', 'module_shape': 'rounded'},
+    ])
+    prefix = str(tmp_path / 'run')
+    options = ExportOptions(str(tmp_path / 'out'), verify_rate=1)
+
+    result, stages = run_profiled(lambda: run_manifest(str(manifest), options, workers=1), prefix, interval=0.001)
+
+    assert result == (2, 2, [])
+    for suffix in ('.pstats', '.txt', '.collapsed'):
+        assert os.path.getsize(prefix + suffix) > 0
+    assert 'cumulative' in open(prefix + '.txt', encoding='utf-8').read()
+
+    with open(prefix + '.collapsed', encoding='utf-8') as collapsed:
+        lines = collapsed.read().splitlines()
+    assert lines
+    for line in lines:
+        assert line.split(';', 1)[0] in STAGES
+        assert re.search(r' [1-9][0-9]*$', line)
+    assert sum(stages.values()) == sum(int(line.rsplit(' ', 1)[1]) for line in lines)
+
+
+def test_profiled_formats_run_shows_render_and_save(tmp_path):
+    manifest = tmp_path / 'manifest.csv'
+    write_manifest(manifest, [
+        {'data': f'https://example.com/{i}/' + 'x' * 300, 'filename': f'code{i}.png',
+         'module_shape': 'rounded', 'gradient_color': '#0000ff'}
+        for i in range(6)
+    ])
+    prefix = tmp_path / 'profile'
+    args, _ = parse_args([
+        '--batch', str(manifest), '--output', str(tmp_path / 'out'),
+        '--profile', str(prefix), '--formats', 'png,jpg,svg,thumb'
+    ])
+
+    assert run_batch_cli(args) == 0
+    stages = collapsed_stages(f'{prefix}.collapsed')
+    assert {'render', 'save'} <= stages <= STAGES
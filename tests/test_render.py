@@ -0,0 +1,67 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from PIL import Image
+
+from batch import verify_files
+from decoder import decode_image, verify_image
+from encoder import QR_BORDER, encode_matrix, encode_symbols, split_payload
+from renderer import MODULE_SHAPES, QRStyle, _module_sprites, render_matrix, write_svg
+
+
+@pytest.mark.parametrize('shape', MODULE_SHAPES)
+@pytest.mark.parametrize('box_size', [1, 2, 3, 4, 10])
+def test_sprites_for_every_box_size(shape, box_size):
+    # The preview uses 1-2 px per module for large versions
+    for sprite in _module_sprites(shape, box_size).values():
+        assert sprite.size == (box_size, box_size)
+
+
+@pytest.mark.parametrize('shape', MODULE_SHAPES)
+@pytest.mark.parametrize('box_size', [1, 2, 3])
+def test_small_box_sizes_render(shape, box_size):
+    matrix = encode_matrix('https://example.com/' + 'x' * 400)
+    image = render_matrix(matrix, box_size, QRStyle(module_shape=shape))
+    assert image.size == (len(matrix) * box_size,) * 2
+
+    if box_size >= 3:
+        assert decode_image(image) == 'https://example.com/' + 'x' * 400
+
+
+@pytest.mark.parametrize('max_version', [4, 6])
+def test_sheet_grid_is_explicit(max_version):
+    data = 'https://example.com/' + 'x' * 300
+    matrix, grid = encode_symbols(data, max_version, workers=1)
+    count = len(split_payload(data, max_version))
+
+    assert grid.count == count > 1
+    assert (len(matrix), len(matrix[0])) == (grid.rows * grid.size, grid.columns * grid.size)
+    assert (grid.size - 2 * QR_BORDER - 17) % 4 == 0
+    assert len(grid.origins()) == count
+    for top, left in grid.origins():
+        assert matrix[top + QR_BORDER][left + QR_BORDER]
+
+
+@pytest.mark.parametrize('shape', MODULE_SHAPES)
+def test_styled_sheet_decodes(tmp_path, shape):
+    logo = tmp_path / 'logo.png'
+    Image.new('RGB', (32, 32), '#c00').save(logo)
+    data = 'https://example.com/' + 'y' * 300
+    matrix, grid = encode_symbols(data, 6, workers=1)
+    style = QRStyle(module_shape=shape, logo_path=str(logo))
+
+    image = render_matrix(matrix, 6, style, grid)
+    assert verify_image(image, data, grid) is None
+
+    image.save(tmp_path / 'sheet.png')
+    write_svg(matrix, tmp_path / 'sheet.svg', 6, style, grid)
+    assert verify_files([tmp_path / 'sheet.png', tmp_path / 'sheet.svg'], grid, data) is None
+    assert (tmp_path / 'sheet.svg').read_text().count('<image ') == grid.count
+
+
+def test_shared_executor_matches_inline_encoding():
+    data = 'z' * 5000
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context('spawn')) as pool:
+        assert encode_symbols(data, executor=pool) == encode_symbols(data, workers=1)
@@ -0,0 +1,87 @@
+import http.client
+import threading
+
+import pytest
+
+from short_links import ShortLinkRegistry, create_link_server, link_server_address
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = ShortLinkRegistry(str(tmp_path / 'links.sqlite3'))
+    yield registry
+    registry.close()
+
+
+@pytest.fixture
+def server(registry):
+    server = create_link_server(registry, '127.0.0.1', 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def request(server, method, path):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+    try:
+        connection.request(method, path)
+        response = connection.getresponse()
+        response.read()
+        return response
+    finally:
+        connection.close()
+
+
+def test_shorten_gives_every_request_its_own_code(registry):
+    first = registry.shorten('https://example.com/a')
+    second = registry.shorten('https://example.com/a')
+
+    assert first != second
+    registry.update(first, 'https://example.com/b')
+    assert registry.resolve(first) == 'https://example.com/b'
+    assert registry.resolve(second) == 'https://example.com/a'
+
+
+def test_shorten_rejects_non_http_targets(registry):
+    with pytest.raises(ValueError):
+        registry.shorten('ftp://example.com/file')
+    with pytest.raises(ValueError):
+        registry.update('NOPE', 'https://example.com')
+
+
+@pytest.mark.parametrize('method', ['GET', 'HEAD'])
+def test_server_redirects_to_target(registry, server, method):
+    code = registry.shorten('https://example.com/page?x=1')
+
+    response = request(server, method, f'/{code}')
+    assert response.status == 302
+    assert response.getheader('Location') == 'https://example.com/page?x=1'
+    assert response.getheader('Cache-Control') == 'no-store'
+
+    # Codes are printed in capitals but scanners may lowercase the path
+    assert request(server, method, f'/{code.lower()}').status == 302
+
+
+def test_server_follows_updates(registry, server):
+    code = registry.shorten('https://example.com/old')
+    registry.update(code, 'https://example.com/new')
+
+    assert request(server, 'GET', f'/{code}').getheader('Location') == 'https://example.com/new'
+
+
+@pytest.mark.parametrize('method', ['GET', 'HEAD'])
+def test_server_returns_404_for_unknown_code(server, method):
+    assert request(server, method, '/UNKNOWN').status == 404
+    assert request(server, method, '/').status == 404
+
+
+@pytest.mark.parametrize('base, address', [
+    ('http://192.168.1.10:8765', ('192.168.1.10', 8765)),
+    ('http://go.example.com', ('go.example.com', 80)),
+    ('https://go.example.com', ('go.example.com', 443)),
+])
+def test_link_server_address(base, address):
+    assert link_server_address(base) == address